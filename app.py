@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""Launcher kept at the repo root so `python3 app.py` works as documented."""
+
+import sys
+
+from cineluck.main import main
+
+if __name__ == "__main__":
+    sys.exit(main())
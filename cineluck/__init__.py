@@ -0,0 +1,49 @@
+"""CineLuck — Raspberry Pi 5 video camera application.
+
+The public names below are loaded lazily (PEP 562): importing
+``cineluck`` does not pull in PyQt6, Picamera2, sounddevice or numpy
+until one of the heavy classes is actually referenced, so CLI consumers
+that only need :class:`ConfigManager` start fast.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+__version__ = "0.1.0"
+__all__ = ["CineLuckApp", "ConfigManager", "StateMachine"]
+
+_LAZY = {
+    "CineLuckApp": (".app", "CineLuckApp"),
+    "ConfigManager": (".config.manager", "ConfigManager"),
+    "StateMachine": (".state.machine", "StateMachine"),
+}
+
+if TYPE_CHECKING:
+    from .app import CineLuckApp
+    from .config.manager import ConfigManager
+    from .state.machine import StateMachine
+
+
+def __getattr__(name):
+    try:
+        path, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    mod = importlib.import_module(path, __name__)
+    val = getattr(mod, attr)
+    globals()[name] = val
+    return val
+
+
+def __dir__():
+    return sorted(set(list(globals()) + list(_LAZY)))
+
+
+def get_config_manager(*args, **kwargs):
+    """Construct a :class:`ConfigManager` without importing the GUI stack."""
+    return __getattr__("ConfigManager")(*args, **kwargs)
+
+
+def get_app(*args, **kwargs):
+    """Construct the :class:`CineLuckApp` main window (imports PyQt6 etc.)."""
+    return __getattr__("CineLuckApp")(*args, **kwargs)
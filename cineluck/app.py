@@ -0,0 +1,465 @@
+"""CineLuck main application window.
+
+Touch-first layout for the 800x640 display: top status bar, centre
+preview, bottom control bar, and slide-in exposure/colour panels. The
+window owns all managers and wires them to the state machine.
+"""
+
+import functools
+import logging
+from pathlib import Path
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QColor, QFont, QPalette
+from PyQt6.QtWidgets import (
+    QHBoxLayout, QMainWindow, QMessageBox, QVBoxLayout, QWidget,
+)
+
+from .audio.manager import AudioManager
+from .camera.encoder import EncoderManager
+from .camera.manager import CameraManager
+from .config.manager import ConfigManager
+from .state import machine
+from .state.machine import CameraState, SafeStopManager, StateMachine
+from .ui.dialogs import SafeStopDialog
+from .ui.panels import ColorPanel, ExposurePanel
+from .ui.widgets import BottomBar, PreviewArea, TopBar
+from .utils.file_utils import FileUtils
+from .utils.system_info import SystemInfo
+
+
+# Touch stylesheet and dark palette, built once at import rather than per
+# window instantiation.
+_TOUCH_QSS = """
+    QMainWindow { background-color: #232323; }
+    QWidget { color: #eeeeee; }
+    QPushButton {
+        background-color: #3a3a3a;
+        border: 1px solid #555;
+        border-radius: 6px;
+        padding: 8px;
+        font-size: 15px;
+    }
+    QPushButton:pressed { background-color: #505050; }
+    QPushButton:disabled { color: #777; }
+    QSlider::groove:horizontal {
+        height: 10px; background: #444; border-radius: 5px;
+    }
+    QSlider::handle:horizontal {
+        width: 28px; margin: -9px 0;
+        background: #bbb; border-radius: 14px;
+    }
+    QComboBox {
+        background-color: #3a3a3a; border: 1px solid #555;
+        border-radius: 4px; padding: 6px; min-height: 32px;
+    }
+    QCheckBox::indicator { width: 24px; height: 24px; }
+    QLabel { font-size: 14px; }
+    QWidget#sidePanel { background-color: #333; }
+    QWidget#sidePanel QGroupBox { border: 1px solid #555; margin-top: 12px; }
+    QWidget#sidePanel QGroupBox::title { subcontrol-origin: margin; left: 8px; }
+    QPushButton#closeBtn { background-color: #555; border-radius: 4px; }
+    QPushButton#closeBtn:pressed { background-color: #777; }
+    QPushButton#resetBtn { background-color: #444; border-radius: 4px; }
+    QPushButton#resetBtn:pressed { background-color: #666; }
+    QMessageBox { background-color: #2a2a2a; }
+    QMessageBox QLabel { color: #eee; }
+    QMessageBox QPushButton { min-width: 80px; min-height: 36px; }
+"""
+
+# Enum and ctor bound to locals once; the table holds ready-made QColor
+# instances so applying the palette is a plain two-item loop.
+_CR = QPalette.ColorRole
+_QC = QColor
+_PALETTE_COLORS = (
+    (_CR.Window, _QC(35, 35, 35)),
+    (_CR.WindowText, _QC(255, 255, 255)),
+    (_CR.Base, _QC(25, 25, 25)),
+    (_CR.AlternateBase, _QC(45, 45, 45)),
+    (_CR.ToolTipBase, _QC(35, 35, 35)),
+    (_CR.ToolTipText, _QC(255, 255, 255)),
+    (_CR.Text, _QC(255, 255, 255)),
+    (_CR.Button, _QC(58, 58, 58)),
+    (_CR.ButtonText, _QC(255, 255, 255)),
+    (_CR.BrightText, _QC(255, 80, 80)),
+    (_CR.Highlight, _QC(70, 130, 180)),
+    (_CR.HighlightedText, _QC(255, 255, 255)),
+    (_CR.Link, _QC(100, 160, 220)),
+    (_CR.PlaceholderText, _QC(140, 140, 140)),
+)
+
+
+@functools.lru_cache(maxsize=4)
+def _base_font(point_size: int) -> QFont:
+    font = QFont()
+    font.setPointSize(point_size)
+    return font
+
+
+class CineLuckApp(QMainWindow):
+    """Main window and application controller."""
+
+    TICK_INTERVAL_MS = 1000  # fastest required rate (device-scan gate)
+
+    def __init__(self, config_manager=None):
+        if not machine.QT_AVAILABLE:
+            # Fail fast with a diagnosis: without the Qt signal base the
+            # first state_machine.*.connect call would die with a bare
+            # AttributeError deep inside _connect_signals.
+            raise RuntimeError(
+                "cineluck.state.machine loaded its non-Qt fallback "
+                "(CINELUCK_NO_QT is set or PyQt6 is missing); "
+                "the GUI requires the Qt signal base"
+            )
+        super().__init__()
+        self.logger = logging.getLogger(__name__)
+
+        self.config_manager = config_manager or ConfigManager()
+        self.state_machine = StateMachine()
+        self.encoder_manager = EncoderManager(self.config_manager)
+        self.camera_manager = CameraManager(self.config_manager, self.encoder_manager)
+        self.audio_manager = AudioManager(self.config_manager)
+        self.safe_stop_manager = SafeStopManager(
+            self.state_machine, self.camera_manager, self.encoder_manager
+        )
+        self.system_info = SystemInfo()
+        self.file_utils = FileUtils(self.config_manager)
+
+        # Hot config keys, cached as attributes and refreshed on change so
+        # the periodic monitor doesn't hit the config manager every tick.
+        self._thermal_throttle_temp = self.config_manager.get("thermal_throttle_temp", 70)
+        self._min_free_space_gb = self.config_manager.get("min_free_space_gb", 2.0)
+        self.config_manager.add_change_listener(self._handle_config_change)
+
+        self._setup_ui()
+        self._setup_touch_styling()
+        self._connect_signals()
+
+        # One bundled monotonic tick services every periodic task. Separate
+        # QTimers each cost an event-loop wakeup; on ARM each wakeup defeats
+        # CPU idle states, so everything counts multiples of one base tick.
+        # (The audio level is pushed from the capture callback, not polled.)
+        self._tick_count = 0
+        self._periodic_tasks = []
+        self._register_periodic(2000, self._update_system_status)
+        self._register_periodic(1000, self.audio_manager.maybe_scan_devices)
+        self._tick_timer = QTimer(self)
+        self._tick_timer.setInterval(self.TICK_INTERVAL_MS)
+        self._tick_timer.timeout.connect(self._on_tick)
+        self._tick_timer.start()
+
+        if self.camera_manager.initialize_camera():
+            self.state_machine.transition_to(CameraState.PREVIEW)
+            self.camera_manager.start_preview()
+        if self.config_manager.get("audio_enabled", True):
+            self.audio_manager.start_monitoring()
+
+    def _setup_ui(self) -> None:
+        """Build the fixed touch layout."""
+        self.setWindowTitle("CineLuck")
+        self.setFixedSize(800, 640)
+
+        central = QWidget()
+        self.setCentralWidget(central)
+        root_layout = QVBoxLayout(central)
+        root_layout.setContentsMargins(0, 0, 0, 0)
+        root_layout.setSpacing(0)
+
+        self.top_bar = TopBar()
+        root_layout.addWidget(self.top_bar)
+
+        content = QWidget()
+        self.content_layout = QHBoxLayout(content)
+        self.content_layout.setContentsMargins(0, 0, 0, 0)
+        self.content_layout.setSpacing(0)
+
+        # Panels are built lazily on first open: each constructs ~8 input
+        # widgets, connects half a dozen signals and reads the config —
+        # all wasted at startup if the user never opens them.
+        self.exposure_panel = None
+        self.color_panel = None
+
+        self.preview_area = PreviewArea()
+        self.content_layout.addWidget(self.preview_area, 1)
+
+        root_layout.addWidget(content, 1)
+
+        self.bottom_bar = BottomBar()
+        root_layout.addWidget(self.bottom_bar)
+
+        self.left_panel_visible = False
+        self.right_panel_visible = False
+        self.safe_stop_dialog = SafeStopDialog(self.safe_stop_manager, self)
+        # Message boxes are built on first use and then recycled: a
+        # repeated error (camera-not-ready, card-full) must not pay a
+        # dozen QObject allocations per occurrence.
+        self._error_box = None
+        self._info_box = None
+
+    def _setup_touch_styling(self) -> None:
+        """Apply the dark touch palette, stylesheet and base font."""
+        self.setStyleSheet(_TOUCH_QSS)
+        dark_palette = QPalette()
+        for role, color in _PALETTE_COLORS:
+            dark_palette.setColor(role, color)
+        self.setPalette(dark_palette)
+        self.setFont(_base_font(11))
+
+    def _connect_signals(self) -> None:
+        """Wire managers, state machine and UI together.
+
+        Connection types are explicit: DirectConnection skips Qt's per-emit
+        thread check for signals that only ever fire on the GUI thread,
+        while signals emitted from worker/callback threads (preview frames,
+        audio levels) are queued. State-machine and error signals stay on
+        AutoConnection because they can fire from either side (safe-stop
+        worker, watchdog, recovery timer).
+        """
+        direct = Qt.ConnectionType.DirectConnection
+        queued = Qt.ConnectionType.QueuedConnection
+
+        self.state_machine.state_changed.connect(self._handle_state_change)
+        self.state_machine.error_occurred.connect(self.show_error_message)
+
+        self.camera_manager.preview_frame_ready.connect(
+            self.preview_area.display_frame, type=queued
+        )
+        self.camera_manager.preview_frame_ready.connect(
+            lambda _frame: self.state_machine.reset_watchdog(), type=queued
+        )
+        # Auto, not direct: recording_stopped is emitted from the
+        # safe-stop worker thread (and both can fire from closeEvent on
+        # the GUI thread), so the sidecar write must be queued back here.
+        self.camera_manager.recording_started.connect(self._handle_recording_started)
+        self.camera_manager.recording_stopped.connect(self._handle_recording_stopped)
+        self.camera_manager.camera_error.connect(self.show_error_message)
+        self.camera_manager.camera_stats_updated.connect(
+            self.top_bar.update_camera_stats, type=direct
+        )
+
+        self.audio_manager.audio_level_updated.connect(
+            self._handle_audio_level, type=queued
+        )
+        self.audio_manager.audio_error.connect(self.show_error_message)
+
+        self.bottom_bar.record_toggled.connect(self.toggle_recording, type=direct)
+        self.bottom_bar.exposure_requested.connect(self.toggle_exposure_panel, type=direct)
+        self.bottom_bar.color_requested.connect(self.toggle_color_panel, type=direct)
+
+    def _handle_config_change(self, key: str, value) -> None:
+        """Refresh cached hot keys when the config changes."""
+        if key == "thermal_throttle_temp":
+            self._thermal_throttle_temp = value
+        elif key == "min_free_space_gb":
+            self._min_free_space_gb = value
+
+    def _register_periodic(self, interval_ms: int, callback) -> None:
+        """Register *callback* to run every *interval_ms*, quantized to the
+        nearest multiple of the base tick."""
+        ticks = max(1, round(interval_ms / self.TICK_INTERVAL_MS))
+        self._periodic_tasks.append((ticks, callback))
+
+    def _on_tick(self) -> None:
+        """Single bundled tick servicing each subsystem at its own period."""
+        self._tick_count += 1
+        for ticks, callback in self._periodic_tasks:
+            if self._tick_count % ticks == 0:
+                callback()
+
+    def _update_system_status(self) -> None:
+        """Timer slot: refresh temperature/free space and enforce guards."""
+        snapshot = self.system_info.get_snapshot(self.file_utils.get_recording_root())
+        temp = snapshot["cpu_temp"]
+        free_gb = snapshot["free_space_gb"]
+        self.top_bar.update_system_status(temp, free_gb)
+
+        if temp >= self._thermal_throttle_temp:
+            self.logger.warning(
+                f"Thermal throttle: {temp:.0f}C >= {self._thermal_throttle_temp}C"
+            )
+
+        if free_gb < self._min_free_space_gb and self.state_machine.is_state(CameraState.RECORDING):
+            self.logger.warning("Free space low — stopping recording")
+            self.stop_recording()
+
+    def _handle_audio_level(self, level: float) -> None:
+        """Forward the VU level to the bottom bar meter (if present)."""
+        if hasattr(self.bottom_bar, "update_audio_level"):
+            self.bottom_bar.update_audio_level(level)
+
+    def toggle_recording(self) -> None:
+        if self.state_machine.is_state(CameraState.RECORDING):
+            self.stop_recording()
+        else:
+            self.start_recording()
+
+    def start_recording(self) -> None:
+        """Begin a new clip using the configured codec/container."""
+        if not self.state_machine.can_transition_to(CameraState.RECORDING):
+            return
+        fps = self.config_manager.get("frame_rate", 25)
+        codec = self.config_manager.get("codec", "h264")
+        container = self.config_manager.get("container", "mkv")
+        output_path = self.file_utils.build_output_path(fps, codec, container)
+        if self.camera_manager.start_recording(output_path):
+            self.state_machine.transition_to(CameraState.RECORDING)
+
+    def stop_recording(self) -> None:
+        """Run the safe-stop sequence behind the modal dialog."""
+        if not self.state_machine.is_state(CameraState.RECORDING):
+            return
+        self.safe_stop_dialog.show()
+        self.safe_stop_manager.safe_stop_recording()
+
+    def _handle_recording_started(self, path: str) -> None:
+        self.logger.info(f"Recording started: {path}")
+
+    def _handle_recording_stopped(self, path: str) -> None:
+        self.logger.info(f"Recording stopped: {path}")
+        settings = {key: self.config_manager.get(key) for key in (
+            "frame_rate", "codec", "container", "bitrate", "shutter_speed_us",
+            "iso_value", "auto_exposure", "auto_white_balance",
+            "color_temperature", "tint", "contrast", "saturation", "sharpness",
+        )}
+        self.file_utils.write_sidecar(Path(path), settings)
+
+    def _handle_state_change(self, new_state, old_state) -> None:
+        """Propagate state transitions to the UI."""
+        self.top_bar.handle_state_change(new_state, old_state)
+        self.bottom_bar.handle_state_change(new_state, old_state)
+        self.preview_area.handle_state_change(new_state, old_state)
+        if self.exposure_panel is not None:
+            self.exposure_panel.handle_state_change(new_state, old_state)
+        if self.color_panel is not None:
+            self.color_panel.handle_state_change(new_state, old_state)
+
+        if new_state == CameraState.RECORDING:
+            self.hide_exposure_panel()
+            self.hide_color_panel()
+
+    # Panel visibility -----------------------------------------------------
+
+    def _build_exposure_panel(self) -> None:
+        self.exposure_panel = ExposurePanel(self.config_manager, self.camera_manager)
+        self.exposure_panel.close_button.clicked.connect(self.hide_exposure_panel)
+        self.content_layout.insertWidget(0, self.exposure_panel)
+
+    def _build_color_panel(self) -> None:
+        self.color_panel = ColorPanel(self.config_manager, self.camera_manager)
+        self.color_panel.close_button.clicked.connect(self.hide_color_panel)
+        self.content_layout.addWidget(self.color_panel)
+
+    def show_exposure_panel(self) -> None:
+        if self.state_machine.is_state(CameraState.RECORDING):
+            return
+        # Cached flag first: skips the PyQt trampoline into setVisible
+        # when the panel is already in the requested state.
+        if self.left_panel_visible:
+            return
+        if self.exposure_panel is None:
+            self._build_exposure_panel()
+        self.exposure_panel.setVisible(True)
+        self.left_panel_visible = True
+
+    def hide_exposure_panel(self) -> None:
+        if not self.left_panel_visible:
+            return
+        self.exposure_panel.setVisible(False)
+        self.left_panel_visible = False
+
+    def toggle_exposure_panel(self) -> None:
+        if self.left_panel_visible:
+            self.hide_exposure_panel()
+        else:
+            self.show_exposure_panel()
+
+    def show_color_panel(self) -> None:
+        if self.state_machine.is_state(CameraState.RECORDING):
+            return
+        if self.right_panel_visible:
+            return
+        if self.color_panel is None:
+            self._build_color_panel()
+        self.color_panel.setVisible(True)
+        self.right_panel_visible = True
+
+    def hide_color_panel(self) -> None:
+        if not self.right_panel_visible:
+            return
+        self.color_panel.setVisible(False)
+        self.right_panel_visible = False
+
+    def toggle_color_panel(self) -> None:
+        if self.right_panel_visible:
+            self.hide_color_panel()
+        else:
+            self.show_color_panel()
+
+    # Input ----------------------------------------------------------------
+
+    # Key -> method name: one dict probe per keystroke instead of up to
+    # five sequential comparisons, and the whole shortcut map is
+    # greppable in one place. Names resolve through getattr at dispatch
+    # so the bound methods aren't frozen at class-build time.
+    _KEY_HANDLERS = {
+        Qt.Key.Key_Space: "toggle_recording",
+        Qt.Key.Key_F1: "toggle_exposure_panel",
+        Qt.Key.Key_F2: "toggle_color_panel",
+        Qt.Key.Key_Escape: "_hide_panels",
+        Qt.Key.Key_F11: "_toggle_fullscreen",
+    }
+
+    def _hide_panels(self) -> None:
+        self.hide_exposure_panel()
+        self.hide_color_panel()
+
+    def _toggle_fullscreen(self) -> None:
+        if self.isFullScreen():
+            self.showNormal()
+        else:
+            self.showFullScreen()
+
+    def keyPressEvent(self, event) -> None:
+        """Keyboard shortcuts mirroring the touch controls."""
+        handler = self._KEY_HANDLERS.get(event.key())
+        if handler is not None:
+            getattr(self, handler)()
+        else:
+            super().keyPressEvent(event)
+
+    # Dialogs --------------------------------------------------------------
+
+    def show_error_message(self, message: str) -> None:
+        # Boxes inherit the window stylesheet; only the text changes
+        # between invocations.
+        if self._error_box is None:
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Icon.Critical)
+            box.setWindowTitle("CineLuck Error")
+            box.setStandardButtons(QMessageBox.StandardButton.Ok)
+            self._error_box = box
+        self._error_box.setText(message)
+        self._error_box.exec()
+
+    def show_info_message(self, message: str) -> None:
+        if self._info_box is None:
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Icon.Information)
+            box.setWindowTitle("CineLuck")
+            box.setStandardButtons(QMessageBox.StandardButton.Ok)
+            self._info_box = box
+        self._info_box.setText(message)
+        self._info_box.exec()
+
+    # Shutdown -------------------------------------------------------------
+
+    def closeEvent(self, event) -> None:
+        """Shut down managers in a safe order."""
+        self.logger.info("Shutting down")
+        if self.state_machine.is_state(CameraState.RECORDING):
+            self.camera_manager.stop_recording()
+        self._tick_timer.stop()
+        self.audio_manager.shutdown()
+        self.camera_manager.close_camera()
+        self.state_machine.shutdown()
+        super().closeEvent(event)
@@ -0,0 +1,5 @@
+"""Audio package for CineLuck."""
+
+from .manager import AudioManager, AUDIO_AVAILABLE
+
+__all__ = ["AudioManager", "AUDIO_AVAILABLE"]
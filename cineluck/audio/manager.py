@@ -0,0 +1,307 @@
+"""Audio capture management: USB device scanning, level metering and selection.
+
+Audio flows through sounddevice/PortAudio into ALSA. The level meter runs
+an InputStream callback that computes a normalized 0..1 VU value consumed
+by the on-screen peak meter.
+"""
+
+import ctypes
+import logging
+import math
+import os
+import threading
+import time
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, pyqtSignal
+
+try:
+    import sounddevice as sd
+    AUDIO_AVAILABLE = True
+except ImportError:
+    AUDIO_AVAILABLE = False
+
+
+# Mean-square -> dB via math.frexp: ms = m * 2**e with m in [0.5, 1),
+# so 10*log10(ms) splits into a per-octave term from the exponent plus a
+# small mantissa correction read from a table. Logarithmic indexing keeps
+# full resolution across the whole -60..0 dBFS metering range — a table
+# indexed linearly in mean-square would collapse everything below about
+# -24 dBFS into its first bucket.
+_DB_PER_OCTAVE = 10.0 * math.log10(2.0)
+# 10*log10(m) over [0.5, 1) in 64 buckets (~0.05 dB steps, well inside
+# the meter's 6-bit quantization).
+_MANTISSA_DB = tuple(
+    10.0 * math.log10(0.5 + (i + 0.5) / 128.0) for i in range(64)
+)
+_INV_METER_RANGE = 1.0 / 60.0  # normalize -60..0 dBFS to 0..1
+
+
+class AudioManager(QObject):
+    """Manages USB audio input devices and live level monitoring."""
+
+    # Device-scan backoff bounds: quick after a change, near-idle when the
+    # device set has been stable (the common case after boot).
+    SCAN_INTERVAL_MIN = 1.0
+    SCAN_INTERVAL_MAX = 60.0
+
+    audio_level_updated = pyqtSignal(float)
+    audio_devices_changed = pyqtSignal(list)
+    audio_error = pyqtSignal(str)
+
+    def __init__(self, config_manager, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.config_manager = config_manager
+
+        self.input_devices = []
+        self._devices_by_id = {}
+        self._devices_fingerprint = None
+        self.current_device = None
+        self.audio_stream = None
+        self.monitoring_enabled = False
+        # Written by the PortAudio callback thread, read by the Qt thread.
+        # A c_float store is a naked write with no refcount traffic, so the
+        # audio thread never blocks on Python object churn.
+        self._peak_ctype = ctypes.c_float(0.0)
+        self._inv_n = 1.0 / (1024 * 2)
+        self._last_emitted_bucket = -1
+        self._lock = threading.Lock()
+
+        self.sample_rate = self.config_manager.get("sample_rate", 48000)
+        self.channels = 2
+        self.input_gain = self.config_manager.get("input_gain", 1.0)
+
+        self._scan_interval = self.SCAN_INTERVAL_MIN
+        self._next_scan_time = 0.0
+
+        # udev fires on USB hotplug, so in the common case we never poll:
+        # the /dev/snd watcher forces an immediate rescan and the periodic
+        # path only serves as a safety net.
+        self._snd_watcher = None
+        if os.path.isdir("/dev/snd"):
+            self._snd_watcher = QFileSystemWatcher(["/dev/snd"], self)
+            self._snd_watcher.directoryChanged.connect(self._handle_snd_change)
+
+        if AUDIO_AVAILABLE:
+            self._scan_audio_devices()
+
+    def _handle_snd_change(self, _path: str) -> None:
+        """udev reported a /dev/snd change: rescan now, resume quick polling."""
+        self._scan_interval = self.SCAN_INTERVAL_MIN
+        self._next_scan_time = 0.0
+        self.maybe_scan_devices()
+
+    def maybe_scan_devices(self) -> None:
+        """Periodic-tick slot: rescan with adaptive backoff.
+
+        Stable scans double the interval up to SCAN_INTERVAL_MAX; a change
+        (or a /dev/snd event) resets it to SCAN_INTERVAL_MIN.
+        """
+        now = time.monotonic()
+        if now < self._next_scan_time:
+            return
+        changed = self._scan_audio_devices()
+        if changed:
+            self._scan_interval = self.SCAN_INTERVAL_MIN
+        else:
+            self._scan_interval = min(self._scan_interval * 2, self.SCAN_INTERVAL_MAX)
+        self._next_scan_time = now + self._scan_interval
+
+    def _scan_audio_devices(self) -> bool:
+        """Enumerate input-capable devices; returns True if the set changed."""
+        if not AUDIO_AVAILABLE:
+            return False
+        try:
+            devices = sd.query_devices()
+        except Exception as e:
+            self.logger.error(f"Audio device query failed: {e}")
+            return False
+
+        # Fingerprint the raw PortAudio result; in the steady state (no USB
+        # hotplug) we skip rebuilding the per-device dicts entirely.
+        fingerprint = hash(tuple(
+            (d["name"], d["max_input_channels"], d["default_samplerate"])
+            for d in devices
+        ))
+        if fingerprint == self._devices_fingerprint:
+            return False
+        self._devices_fingerprint = fingerprint
+
+        input_devices = []
+        for idx, device in enumerate(devices):
+            if device["max_input_channels"] > 0:
+                input_devices.append({
+                    "id": idx,
+                    "name": device["name"],
+                    "channels": device["max_input_channels"],
+                    "sample_rate": device["default_samplerate"],
+                })
+
+        self.input_devices = input_devices
+        self._devices_by_id = {d["id"]: d for d in input_devices}
+        self.logger.info(f"Found {len(input_devices)} audio input devices")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "devices: " + ", ".join(f"{d['name']}(#{d['id']})" for d in input_devices)
+            )
+        self.audio_devices_changed.emit(input_devices)
+
+        # Auto-reconnect: if the selected device vanished, drop it.
+        if self.current_device is not None and self.current_device["id"] not in self._devices_by_id:
+            self.logger.warning("Selected audio device disconnected")
+            self.current_device = None
+            self._stop_level_monitoring()
+        return True
+
+    def select_input_device(self, device_id: int) -> bool:
+        """Select a device by id, verifying it can actually be opened."""
+        if not AUDIO_AVAILABLE:
+            return False
+
+        device_info = self._devices_by_id.get(device_id)
+        if device_info is None:
+            self.logger.error(f"Unknown audio device id {device_id}")
+            return False
+
+        self.current_device = device_info
+        self.config_manager.set("audio_device", device_info["name"])
+        self.logger.info(f"Selected audio device: {device_info['name']}")
+
+        # The monitoring stream doubles as the device test: if it opens and
+        # starts, the device works — no separate probe open/close round trip.
+        if self.monitoring_enabled:
+            return self._start_level_monitoring()
+        return True
+
+    def start_monitoring(self) -> None:
+        """Enable the live level meter."""
+        self.monitoring_enabled = True
+        if self.current_device is not None:
+            self._start_level_monitoring()
+
+    def stop_monitoring(self) -> None:
+        """Disable the live level meter."""
+        self.monitoring_enabled = False
+        self._stop_level_monitoring()
+
+    def _start_level_monitoring(self) -> bool:
+        """Open the metering InputStream on the current device."""
+        self._stop_level_monitoring()
+        if self.current_device is None:
+            return False
+        try:
+            # 50 ms blocks: exactly the 20 Hz VU update rate, so the level
+            # can be published straight from the callback and the Python/C
+            # crossing rate is halved versus 1024-frame blocks.
+            blocksize = self.sample_rate // 20
+            channels = min(self.channels, self.current_device["channels"])
+            # Precompute the 1/N normalization so the callback stays scalar.
+            self._inv_n = 1.0 / (blocksize * channels)
+            self.audio_stream = sd.InputStream(
+                device=self.current_device["id"],
+                channels=channels,
+                samplerate=self.sample_rate,
+                blocksize=blocksize,
+                dtype="float32",
+                callback=self.audio_callback,
+            )
+            self.audio_stream.start()
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to start level monitoring: {e}")
+            self.audio_error.emit(f"Level monitoring failed: {e}")
+            self.audio_stream = None
+            return False
+
+    def _stop_level_monitoring(self) -> None:
+        """Tear down the metering stream.
+
+        ALSA teardown can block for tens of ms, so the old stream is closed
+        on a background thread (PortAudio stream close is thread-safe); a
+        replacement stream can open immediately on the calling thread.
+        """
+        stream = self.audio_stream
+        if stream is not None:
+            self.audio_stream = None
+            threading.Thread(
+                target=self._close_stream, args=(stream,), daemon=True
+            ).start()
+        self._peak_ctype.value = 0.0
+
+    def _close_stream(self, stream) -> None:
+        try:
+            stream.stop()
+            stream.close()
+        except Exception as e:
+            self.logger.debug(f"Stream close failed: {e}")
+
+    def audio_callback(self, indata, frames, time_info, status) -> None:
+        """PortAudio callback: compute a normalized VU level for this block.
+
+        Hot path: mean-square via a single BLAS dot on the flattened block,
+        gain folded into the scalar (gain**2), then frexp plus one table
+        lookup for the dB normalization — no transcendentals.
+        """
+        if status:
+            self.logger.debug(f"Audio callback status: {status}")
+        flat = indata.reshape(-1)
+        gain = self.input_gain
+        ms = float(flat @ flat) * self._inv_n * (gain * gain)
+        if ms > 1e-12:
+            m, e = math.frexp(ms)
+            db = _MANTISSA_DB[int((m - 0.5) * 128.0)] + _DB_PER_OCTAVE * e
+            level = (db + 60.0) * _INV_METER_RANGE
+            if level < 0.0:
+                level = 0.0
+            elif level > 1.0:
+                level = 1.0
+        else:
+            level = 0.0
+        self._peak_ctype.value = level
+        # Publish straight from the callback (Qt queues the cross-thread
+        # emit); only when the 6-bit quantized level actually moved, so
+        # idle silence emits nothing at all.
+        bucket = int(level * 64)
+        if bucket != self._last_emitted_bucket:
+            self._last_emitted_bucket = bucket
+            self.audio_level_updated.emit(level)
+
+    @property
+    def peak_level(self) -> float:
+        """Latest normalized 0..1 VU level."""
+        return self._peak_ctype.value
+
+    def set_input_gain(self, gain: float) -> None:
+        """Set the software input gain (1.0 = unity)."""
+        self.input_gain = max(0.0, min(4.0, gain))
+        self.config_manager.set("input_gain", self.input_gain)
+
+    def test_audio_device(self, device_id: int) -> bool:
+        """Return True if the device exists and opens cleanly."""
+        if not AUDIO_AVAILABLE:
+            return False
+        if device_id not in self._devices_by_id:
+            return False
+        try:
+            with sd.InputStream(device=device_id,
+                                channels=1,
+                                samplerate=self.sample_rate,
+                                blocksize=1024):
+                pass
+            return True
+        except Exception:
+            return False
+
+    def get_device_latency(self, device_id: int) -> float:
+        """Return the reported input latency for the device, in seconds."""
+        if device_id not in self._devices_by_id:
+            return 0.0
+        try:
+            info = sd.query_devices(device_id)
+            return float(info.get("default_low_input_latency", 0.0))
+        except Exception:
+            return 0.0
+
+    def shutdown(self) -> None:
+        """Stop streams for application exit."""
+        self._stop_level_monitoring()
@@ -0,0 +1,34 @@
+"""Camera package for CineLuck.
+
+Submodules pull in Picamera2 and numpy, so they are loaded lazily: the
+names below resolve on first attribute access rather than at import time.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+__all__ = ["CameraManager", "EncoderManager"]
+
+_LAZY = {
+    "CameraManager": (".manager", "CameraManager"),
+    "EncoderManager": (".encoder", "EncoderManager"),
+}
+
+if TYPE_CHECKING:
+    from .manager import CameraManager
+    from .encoder import EncoderManager
+
+
+def __getattr__(name):
+    try:
+        path, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    mod = importlib.import_module(path, __name__)
+    val = getattr(mod, attr)
+    globals()[name] = val
+    return val
+
+
+def __dir__():
+    return sorted(set(list(globals()) + list(_LAZY)))
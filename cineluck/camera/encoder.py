@@ -0,0 +1,393 @@
+"""Encoder management: hardware probe, bitrate planning and encode monitoring.
+
+The Pi 5 encodes H.264/H.265 through the V4L2 M2M hardware block; this
+module detects its availability, derives constant bitrates tuned for SSD
+targets, and monitors the growing output file during a recording.
+"""
+
+import logging
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+from typing import Mapping, Optional, Tuple
+
+from PyQt6.QtCore import (
+    QMetaObject, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, pyqtSlot,
+)
+
+
+# Hardware encoders ffmpeg may expose, best first. On the Pi the v4l2m2m
+# pair is the expected hit; the rest make the probe portable.
+_GPU_ENCODER_PRIORITY = [
+    "h264_v4l2m2m", "hevc_v4l2m2m",
+    "h264_nvenc", "hevc_nvenc",
+    "h264_vaapi", "hevc_vaapi",
+    "h264_qsv", "h264_videotoolbox",
+]
+
+# Codec/container display info is static apart from the hardware flag,
+# which is folded in per instance once the probe lands. Read-only views
+# mean zero allocation per lookup.
+_CODEC_INFO_BASE = {
+    "h264": {"name": "H264", "description": "H.264 High Profile", "extension_hint": "AVC"},
+    "h265": {"name": "H265", "description": "H.265 Main Profile", "extension_hint": "HEVC"},
+}
+
+# Bits-per-pixel by supported frame rate, and the per-codec bitrate
+# multiplier (H.265 gets ~equal quality at 0.7x H.264 rate). Dict lookups
+# replace the fps if/elif ladder in the bitrate planner.
+_BPP_BY_FPS = {24: 0.25, 25: 0.25, 30: 0.2, 50: 0.15, 60: 0.15}
+_CODEC_BITRATE_MULT = {"h264": 1.0, "h265": 0.7}
+
+_CONTAINER_INFO = {
+    "mkv": MappingProxyType({
+        "name": "MKV",
+        "description": "Matroska (crash-safe stops)",
+        "crash_safe": True,
+    }),
+    "mp4": MappingProxyType({
+        "name": "MP4",
+        "description": "MPEG-4 (periodic moov updates)",
+        "crash_safe": False,
+    }),
+}
+
+# Hardware capability is a per-boot fact: probe once per process and share
+# the result across EncoderManager instances. The cache holds the detected
+# encoder name (None = software only).
+_HW_ENCODER_CACHE: Optional[str] = None
+_HW_ENCODER_PROBED = False
+_HW_ENCODER_LOCK = threading.Lock()
+
+
+def clear_hw_encoder_cache() -> None:
+    """Forget the cached probe result (for tests)."""
+    global _HW_ENCODER_CACHE, _HW_ENCODER_PROBED
+    with _HW_ENCODER_LOCK:
+        _HW_ENCODER_CACHE = None
+        _HW_ENCODER_PROBED = False
+
+
+class _HwProbeTask(QRunnable):
+    """Runs the encoder probe off the constructor's critical path."""
+
+    def __init__(self, manager: "EncoderManager"):
+        super().__init__()
+        self._manager = manager
+
+    def run(self) -> None:
+        self._manager._finish_hw_probe(self._manager._check_hardware_encoder())
+
+
+class EncoderManager(QObject):
+    """Plans and monitors hardware-encoded recordings."""
+
+    # Hash-set membership: validation probes these on every field change.
+    supported_codecs = frozenset({"h264", "h265"})
+    supported_containers = frozenset({"mkv", "mp4"})
+
+    encoding_started = pyqtSignal(str)
+    encoding_finished = pyqtSignal(str)
+    encoding_progress = pyqtSignal(dict)
+    encoder_error = pyqtSignal(str)
+    hardware_encoder_detected = pyqtSignal(bool)
+
+    def __init__(self, config_manager, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.config_manager = config_manager
+
+        # Supported frame rates as a frozenset, refreshed on config change
+        # so validation never rebuilds a list per call.
+        self._supported_fps = frozenset(
+            self.config_manager.get("frame_rates", [24, 25, 30, 50, 60])
+        )
+        self.config_manager.add_change_listener(self._handle_config_change)
+
+        self.is_encoding = False
+        # Set once the encoder queue has drained; waiters (the safe-stop
+        # worker) block on this instead of a fixed sleep. Idle = drained.
+        self.drain_event = threading.Event()
+        self.drain_event.set()
+        self.current_output_path: Optional[Path] = None
+        self._output_path_str: Optional[str] = None
+        self._encode_start_time = 0.0
+        self._last_size = 0
+
+        # File-growth monitoring runs on the Qt event loop; a dedicated
+        # thread just to stat() once a second costs a stack and wakeups.
+        self._monitor_timer = QTimer(self)
+        self._monitor_timer.setInterval(1000)
+        self._monitor_timer.timeout.connect(self._monitor_tick)
+
+        # The subprocess probe can block for seconds; run it on the global
+        # thread pool. Until it lands, hardware_encoder_available is None
+        # and consumers treat that as "software fallback for now".
+        self.detected_hw_encoder: Optional[str] = None
+        self.hardware_encoder_available: Optional[bool] = None
+        self._rebuild_codec_info()
+        if _HW_ENCODER_PROBED:
+            self._finish_hw_probe(_HW_ENCODER_CACHE)
+        else:
+            QThreadPool.globalInstance().start(_HwProbeTask(self))
+
+    def _handle_config_change(self, key: str, value) -> None:
+        """Config change listener: refresh the cached frame-rate set."""
+        if key == "frame_rates":
+            self._supported_fps = frozenset(value)
+
+    def _finish_hw_probe(self, encoder_name: Optional[str]) -> None:
+        """Record the probe result and notify listeners."""
+        self.detected_hw_encoder = encoder_name
+        self.hardware_encoder_available = encoder_name is not None
+        self._rebuild_codec_info()
+        self.hardware_encoder_detected.emit(self.hardware_encoder_available)
+
+    def _rebuild_codec_info(self) -> None:
+        """Bake the hardware flag into the per-codec read-only info views."""
+        hw = bool(self.hardware_encoder_available)
+        self._codec_info = {
+            name: MappingProxyType({**base, "hardware_supported": hw})
+            for name, base in _CODEC_INFO_BASE.items()
+        }
+
+    def _check_hardware_encoder(self) -> Optional[str]:
+        """Return the cached detected hardware encoder name, probing once."""
+        global _HW_ENCODER_CACHE, _HW_ENCODER_PROBED
+        if _HW_ENCODER_PROBED:
+            return _HW_ENCODER_CACHE
+        with _HW_ENCODER_LOCK:
+            if not _HW_ENCODER_PROBED:
+                _HW_ENCODER_CACHE = self._probe_hardware_encoder()
+                _HW_ENCODER_PROBED = True
+            return _HW_ENCODER_CACHE
+
+    def _probe_hardware_encoder(self) -> Optional[str]:
+        """Scan `ffmpeg -encoders` once for the best available hw encoder."""
+        try:
+            result = subprocess.run(
+                ["ffmpeg", "-hide_banner", "-encoders"],
+                capture_output=True, text=True, timeout=5,
+            )
+        except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+            self.logger.warning(f"ffmpeg probe failed: {e}")
+            return None
+
+        available = set()
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                available.add(parts[1])
+
+        for name in _GPU_ENCODER_PRIORITY:
+            if name in available:
+                self.logger.info(f"Hardware encoder available: {name}")
+                return name
+
+        self.logger.warning("No hardware encoder found; software fallback")
+        return None
+
+    @staticmethod
+    def _compute_bitrate(codec: str, fps: int, width: int, height: int,
+                         configured_bitrate: int) -> int:
+        """Planned bitrate for the settings (codec already lowercased)."""
+        bpp = _BPP_BY_FPS.get(fps, 0.2)
+        bitrate = int(width * height * fps * bpp * _CODEC_BITRATE_MULT.get(codec, 1.0))
+        return max(bitrate, configured_bitrate)
+
+    def get_encoding_parameters(self, codec: str, container: str,
+                                fps: int, resolution: Tuple[int, int]) -> dict:
+        """Return the full encode parameter set for the given settings."""
+        width, height = resolution
+        codec = codec.lower()
+
+        bitrate = self._compute_bitrate(
+            codec, fps, width, height,
+            self.config_manager.get("bitrate", 30_000_000),
+        )
+
+        return {
+            "codec": codec,
+            "container": container.lower(),
+            "bitrate": bitrate,
+            "fps": fps,
+            "resolution": resolution,
+            "profile": "high" if codec == "h264" else "main",
+            "hardware": bool(self.hardware_encoder_available),
+        }
+
+    def validate_encoding_settings(self, codec: str, container: str,
+                                   fps: int, resolution: Tuple[int, int]) -> Tuple[bool, str]:
+        """Check settings against hardware limits; returns (ok, message)."""
+        if codec.lower() not in self.supported_codecs:
+            return False, f"Unsupported codec: {codec}"
+        if container.lower() not in self.supported_containers:
+            return False, f"Unsupported container: {container}"
+        if fps not in self._supported_fps:
+            return False, f"Unsupported frame rate: {fps}"
+
+        if fps >= 50:
+            # Bitrate check without building the full parameter dict.
+            bitrate = self._compute_bitrate(
+                codec.lower(), fps, resolution[0], resolution[1],
+                self.config_manager.get("bitrate", 30_000_000),
+            )
+            if bitrate > 50_000_000:
+                return True, "High bitrate at 50/60 fps: SSD storage recommended"
+
+        return True, "OK"
+
+    def get_codec_info(self, codec: str) -> Mapping:
+        """Return read-only display info for a codec."""
+        info = self._codec_info.get(codec.lower())
+        if info is not None:
+            return info
+        return {
+            "name": codec.upper(),
+            "description": "Unknown codec",
+            "extension_hint": "",
+            "hardware_supported": False,
+        }
+
+    def get_container_info(self, container: str) -> Mapping:
+        """Return read-only display info for a container format."""
+        info = _CONTAINER_INFO.get(container.lower())
+        if info is not None:
+            return info
+        return {
+            "name": container.upper(),
+            "description": "Unknown container",
+            "crash_safe": False,
+        }
+
+    @staticmethod
+    def estimate_file_size_vec(duration_min, fps, width, height,
+                               codec: str = "h264",
+                               default_bitrate: int = 30_000_000) -> np.ndarray:
+        """Vectorized clip-size estimate in GiB.
+
+        All array arguments broadcast, so a storage table across
+        fps/resolution combinations is one call instead of a Python loop
+        per cell. Includes the 10% container/audio overhead.
+        """
+        fps = np.asarray(fps)
+        bpp = np.where(fps >= 50, 0.15, np.where(fps >= 30, 0.2, 0.25))
+        raw = np.asarray(width) * np.asarray(height) * fps * bpp
+        raw = raw * _CODEC_BITRATE_MULT.get(codec.lower(), 1.0)
+        bitrate = np.maximum(raw.astype(np.int64), default_bitrate)
+        return bitrate * np.asarray(duration_min) * 60 * 1.1 / (8 * 1024 ** 3)
+
+    def estimate_file_size(self, duration_min: float, fps: int,
+                           resolution: Tuple[int, int], codec: str = "h264") -> float:
+        """Estimate clip size in GiB for the given duration and settings."""
+        width, height = resolution
+        return float(self.estimate_file_size_vec(
+            duration_min, fps, width, height, codec,
+            self.config_manager.get("bitrate", 30_000_000),
+        ))
+
+    def start_encoding(self, output_path: Path) -> None:
+        """Begin monitoring an encode writing to *output_path*."""
+        self.current_output_path = Path(output_path)
+        self._output_path_str = str(output_path)
+        self.is_encoding = True
+        self.drain_event.clear()
+        self._encode_start_time = time.time()
+        self._last_size = 0
+        self._monitor_timer.start()
+        self.encoding_started.emit(self._output_path_str)
+
+    def _monitor_tick(self) -> None:
+        """Timer slot: sample the output file size and report progress.
+
+        One os.stat() on the cached string path per tick — the separate
+        exists() probe doubled the syscall count for the common case where
+        the file is there. Progress dicts are only built when someone is
+        actually listening.
+        """
+        if self.receivers(self.encoding_progress) == 0:
+            return
+        try:
+            size = os.stat(self._output_path_str).st_size
+        except (FileNotFoundError, TypeError):
+            return
+        elapsed = time.time() - self._encode_start_time
+        progress_info = {
+            "size_mb": size / (1024 * 1024),
+            "duration_s": elapsed,
+            "bitrate_actual": (size - self._last_size) * 8,
+            "path": self._output_path_str,
+        }
+        self._last_size = size
+        self.encoding_progress.emit(progress_info)
+
+    def drain_encoder(self, on_drained=None) -> None:
+        """Set drain_event once the encoder queue has actually emptied.
+
+        Queue drain is observed through the output file: in-flight
+        frames have left the encoder once the muxer stops growing it
+        between consecutive 50 ms samples, so a fast drain releases the
+        waiting safe-stop worker in one or two sample periods. 500 ms
+        remains as the hard upper bound so a stalled muxer cannot wedge
+        the stop sequence.
+
+        Non-blocking and callable from any thread: the poll runs on a
+        short-lived daemon thread (the usual caller is the safe-stop
+        worker on the Qt thread pool, where a QTimer has no event loop
+        to fire from). *on_drained*, if given, runs on the drain thread.
+        """
+
+        def _drain():
+            deadline = time.monotonic() + 0.5
+            last_size = -1
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                try:
+                    size = os.stat(self._output_path_str).st_size
+                except (FileNotFoundError, TypeError):
+                    # No file to watch (elementary stream not yet
+                    # created, or already finalized): nothing to drain.
+                    break
+                if size == last_size:
+                    break
+                last_size = size
+            self.drain_event.set()
+            if on_drained is not None:
+                on_drained()
+
+        threading.Thread(target=_drain, name="encoder-drain", daemon=True).start()
+
+    def stop_encoding(self) -> None:
+        """Stop monitoring; the finished file is reported after settle.
+
+        Callable from any thread: the monitor timer and the 200 ms
+        muxer-settle singleShot belong to this object's (GUI) thread, so
+        both are marshalled there via invokeMethod — same pattern as the
+        safe-stop manager's worker transitions.
+        """
+        self.is_encoding = False
+        QMetaObject.invokeMethod(self, "_stop_encoding_main")
+
+    @pyqtSlot()
+    def _stop_encoding_main(self) -> None:
+        """Runs on the owning thread: halt monitoring, settle, finalize."""
+        self._monitor_timer.stop()
+        QTimer.singleShot(200, self._finalize_stop)
+
+    def _finalize_stop(self) -> None:
+        """Report the finished file once the muxer has settled."""
+        self.drain_event.set()
+        path = self.current_output_path
+        if path is not None and path.exists():
+            size = path.stat().st_size
+            self.logger.info(
+                f"Encode finished: {path} ({size / (1024 * 1024):.1f} MB)"
+            )
+            self.encoding_finished.emit(str(path))
+        self.current_output_path = None
+        self._output_path_str = None
@@ -0,0 +1,398 @@
+"""Camera management built on Picamera2.
+
+Single fixed DCI 2K (2048x1080) recording mode with a lores preview
+stream letterboxed to the 800x640 touch display. Recording goes through
+the hardware encoder with an FFmpeg muxer for MKV/MP4 output.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+
+try:
+    from picamera2 import MappedArray, Picamera2
+    from picamera2.encoders import H264Encoder, H265Encoder
+    from picamera2.outputs import FfmpegOutput, FileOutput
+    from libcamera import controls
+    PICAMERA2_AVAILABLE = True
+except ImportError:
+    PICAMERA2_AVAILABLE = False
+
+
+RECORD_RESOLUTION = (2048, 1080)  # DCI 2K sensor window
+
+# UI metering names -> libcamera enum, resolved once at import.
+if PICAMERA2_AVAILABLE:
+    _METERING_MAP = {
+        "average": controls.AeMeteringModeEnum.CentreWeighted,
+        "center": controls.AeMeteringModeEnum.CentreWeighted,
+        "spot": controls.AeMeteringModeEnum.Spot,
+        "matrix": controls.AeMeteringModeEnum.Matrix,
+    }
+else:
+    _METERING_MAP = {}
+
+
+class CameraManager(QObject):
+    """Owns the Picamera2 pipeline: preview, controls and recording."""
+
+    preview_frame_ready = pyqtSignal(object)
+    recording_started = pyqtSignal(str)
+    recording_stopped = pyqtSignal(str)
+    camera_error = pyqtSignal(str)
+    camera_stats_updated = pyqtSignal(dict)
+
+    def __init__(self, config_manager, encoder_manager=None, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.config_manager = config_manager
+        self.encoder_manager = encoder_manager
+
+        # Plain Lock: nothing re-enters a locked section (close_camera
+        # uses the *_locked helpers), and Lock skips RLock's owner
+        # bookkeeping on every acquire.
+        self._lock = threading.Lock()
+        self.camera = None
+        self.encoder = None
+        self.is_previewing = False
+        self.is_recording = False
+        self.current_output_path: Optional[Path] = None
+        self.preview_resolution = (800, 424)
+        # Preview pacing for the post-callback: the camera thread delivers
+        # every frame; we forward at most one per interval.
+        self._last_emit_ns = 0
+        self._preview_interval_ns = int(1e9 / self.config_manager.get("preview_fps", 30))
+        # Reused frame buffer: capture_array allocates a fresh ndarray per
+        # frame; copying the DMA-mapped view into this instead keeps the
+        # preview path allocation-free in the steady state.
+        w, h = self.preview_resolution
+        self._preview_buf = np.empty((h, w, 4), dtype=np.uint8)
+        # Latest per-frame metadata, written by the camera thread.
+        self._latest_metadata: dict = {}
+        # Last controls pushed to libcamera; only deltas are sent.
+        self._applied_controls: dict = {}
+        # Set when a recording stop has fully finalized; waiters block on
+        # this instead of a fixed sleep. Idle = stopped.
+        self.stop_complete_event = threading.Event()
+        self.stop_complete_event.set()
+        # Supported frame rates as a frozenset, refreshed on config change.
+        self._supported_fps = frozenset(
+            self.config_manager.get("frame_rates", [24, 25, 30, 50, 60])
+        )
+        self.config_manager.add_change_listener(self._handle_config_change)
+
+        # Periodic stats readout for the top bar / dropped-frame indicator.
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self._update_stats)
+
+        # Deterministic shutdown: release the camera when the Qt event
+        # loop winds down rather than whenever the GC gets around to it.
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close_camera)
+
+    def _handle_config_change(self, key: str, value) -> None:
+        """Config change listener: refresh the cached frame-rate set."""
+        if key == "frame_rates":
+            self._supported_fps = frozenset(value)
+
+    def initialize_camera(self) -> bool:
+        """Open and configure the camera, with retries on failure."""
+        if not PICAMERA2_AVAILABLE:
+            self.camera_error.emit("Picamera2 not available")
+            return False
+
+        with self._lock:
+            for attempt in range(3):
+                try:
+                    self.camera = Picamera2()
+                    config = self.camera.create_video_configuration(
+                        # XRGB on the lores stream: the ISP does the
+                        # YUV->RGB conversion in fixed function, so the
+                        # CPU never touches pixel formats.
+                        main={"size": RECORD_RESOLUTION, "format": "YUV420"},
+                        lores={"size": self.preview_resolution, "format": "XRGB8888"},
+                    )
+                    self.camera.configure(config)
+                    self.camera.post_callback = self._on_frame
+                    self._apply_camera_settings()
+                    self.logger.info("Camera initialized")
+                    return True
+                except Exception as e:
+                    self.logger.warning(f"Camera open attempt {attempt + 1} failed: {e}")
+                    self.camera = None
+                    time.sleep(1.0)
+
+        self.camera_error.emit("Failed to open camera after retries")
+        return False
+
+    def _apply_camera_settings(self) -> None:
+        """Push the configured manual/auto controls to libcamera."""
+        if self.camera is None:
+            return
+
+        # One snapshot instead of eight get() round trips.
+        cfg = self.config_manager.snapshot((
+            "frame_rate", "auto_exposure", "metering_mode",
+            "shutter_speed_us", "iso_value", "auto_white_balance",
+            "color_temperature", "contrast", "saturation", "sharpness",
+        ))
+
+        controls_dict = {}
+
+        frame_time_us = int(1_000_000 / cfg["frame_rate"])
+        controls_dict["FrameDurationLimits"] = (frame_time_us, frame_time_us)
+
+        if cfg["auto_exposure"]:
+            controls_dict["AeEnable"] = True
+            controls_dict["AeMeteringMode"] = _METERING_MAP.get(
+                cfg["metering_mode"], _METERING_MAP["average"]
+            )
+        else:
+            controls_dict["AeEnable"] = False
+            controls_dict["ExposureTime"] = cfg["shutter_speed_us"]
+            controls_dict["AnalogueGain"] = cfg["iso_value"] / 100.0
+
+        if cfg["auto_white_balance"]:
+            controls_dict["AwbEnable"] = True
+        else:
+            controls_dict["AwbEnable"] = False
+            controls_dict["ColourTemperature"] = cfg["color_temperature"]
+
+        controls_dict["Contrast"] = 1.0 + cfg["contrast"] / 100.0
+        controls_dict["Saturation"] = 1.0 + cfg["saturation"] / 100.0
+        controls_dict["Sharpness"] = 1.0 + cfg["sharpness"] / 100.0
+
+        self._push_controls(controls_dict)
+
+    def _push_controls(self, new_controls: dict) -> None:
+        """Send only controls that differ from the last applied set.
+
+        UI slider drags re-apply settings many times a second; sending the
+        unchanged keys again just pads the IPC payload to libcamera.
+        """
+        delta = {
+            k: v for k, v in new_controls.items()
+            if self._applied_controls.get(k) != v
+        }
+        if delta:
+            self.camera.set_controls(delta)
+            self._applied_controls.update(delta)
+
+    def start_preview(self) -> bool:
+        """Start the camera and the preview frame pump."""
+        with self._lock:
+            if self.camera is None or self.is_previewing:
+                return False
+            try:
+                self._preview_interval_ns = int(
+                    1e9 / self.config_manager.get("preview_fps", 30)
+                )
+                self.camera.start()
+                self.is_previewing = True
+                self.stats_timer.start()
+                return True
+            except Exception as e:
+                self.logger.error(f"Failed to start preview: {e}")
+                self.camera_error.emit(f"Preview failed: {e}")
+                return False
+
+    def _on_frame(self, request) -> None:
+        """Picamera2 post-callback: forward lores frames to Qt.
+
+        Runs on the camera's own thread at hardware frame boundaries, so
+        the sensor is the clock — no Python-timed polling, no redundant
+        captures and no timer drift. A monotonic gate throttles emission
+        to preview_fps when the sensor runs faster.
+        """
+        if not self.is_previewing:
+            return
+        # Metadata is already attached to the request; cache it here so
+        # the stats timer never calls capture_metadata(), which blocks
+        # until the next frame completes. A single attribute store is
+        # atomic in CPython, so no lock on the per-frame path.
+        self._latest_metadata = request.get_metadata()
+        now = time.monotonic_ns()
+        if now - self._last_emit_ns < self._preview_interval_ns:
+            return
+        # No subscriber (window hidden/minimized): skip the copy and the
+        # cross-thread marshalling of ~750 KB per frame entirely.
+        if self.receivers(self.preview_frame_ready) == 0:
+            return
+        self._last_emit_ns = now
+        try:
+            with MappedArray(request, "lores") as m:
+                np.copyto(self._preview_buf, m.array)
+            self.preview_frame_ready.emit(self._preview_buf)
+        except Exception as e:
+            self.logger.debug(f"Preview frame failed: {e}")
+
+    def stop_preview(self) -> None:
+        """Stop the preview pump and the camera."""
+        with self._lock:
+            self._stop_preview_locked()
+
+    def _stop_preview_locked(self) -> None:
+        """stop_preview body; caller holds the lock."""
+        if not self.is_previewing:
+            return
+        self.is_previewing = False
+        self.stats_timer.stop()
+        if self.camera is not None:
+            try:
+                self.camera.stop()
+            except Exception as e:
+                self.logger.debug(f"Camera stop failed: {e}")
+
+    def set_frame_rate(self, fps: int) -> bool:
+        """Switch the fixed frame rate; preview restarts are not required."""
+        if fps not in self._supported_fps:
+            self.logger.warning(f"Unsupported frame rate: {fps}")
+            return False
+        self.config_manager.set("frame_rate", fps)
+        with self._lock:
+            if self.camera is not None:
+                frame_time_us = int(1_000_000 / fps)
+                self._push_controls({"FrameDurationLimits": (frame_time_us, frame_time_us)})
+        return True
+
+    def set_white_balance(self, cct: Optional[int], auto: bool) -> None:
+        """Set auto WB or a manual colour temperature in Kelvin."""
+        with self._lock:
+            if self.camera is None:
+                return
+            if auto or cct is None:
+                self._push_controls({"AwbEnable": True})
+            else:
+                self._push_controls({"AwbEnable": False, "ColourTemperature": int(cct)})
+
+    def set_color_adjustments(self, contrast: int, saturation: int, sharpness: int) -> None:
+        """Apply contrast/saturation/sharpness as -100..100 UI steps."""
+        with self._lock:
+            if self.camera is None:
+                return
+            self._push_controls({
+                "Contrast": 1.0 + contrast / 100.0,
+                "Saturation": 1.0 + saturation / 100.0,
+                "Sharpness": 1.0 + sharpness / 100.0,
+            })
+
+    def start_recording(self, output_path: Path,
+                        encoder_name: Optional[str] = None) -> bool:
+        """Start hardware-encoded recording to *output_path*.
+
+        *encoder_name* is the ffmpeg hardware encoder detected by the
+        EncoderManager probe (e.g. ``h264_v4l2m2m``); it defaults to the
+        probe result and steers codec selection toward what the hardware
+        block actually supports.
+        """
+        with self._lock:
+            if self.camera is None or self.is_recording:
+                return False
+            try:
+                cfg = self.config_manager.snapshot(("codec", "bitrate"))
+                codec = cfg["codec"]
+                bitrate = cfg["bitrate"]
+                if encoder_name is None and self.encoder_manager is not None:
+                    encoder_name = self.encoder_manager.detected_hw_encoder
+                if codec == "h265" and encoder_name is not None and "hevc" not in encoder_name:
+                    # The probed hardware block only does H.264; recording
+                    # H.265 would fall back to software encode on a Pi.
+                    self.logger.warning(
+                        f"{encoder_name} has no HEVC support, recording h264 instead"
+                    )
+                    codec = "h264"
+                if codec == "h265":
+                    self.encoder = H265Encoder(bitrate=bitrate)
+                else:
+                    self.encoder = H264Encoder(bitrate=bitrate)
+                if output_path.suffix in (".h264", ".h265"):
+                    # Elementary stream: write the encoder output straight
+                    # to disk, no ffmpeg remux process or pipe copy.
+                    output = FileOutput(str(output_path))
+                else:
+                    # audio=False keeps FfmpegOutput to a pure stream-copy
+                    # remux with no audio graph.
+                    output = FfmpegOutput(str(output_path), audio=False)
+                self.camera.start_encoder(self.encoder, output)
+                self.is_recording = True
+                self.stop_complete_event.clear()
+                self.current_output_path = Path(output_path)
+                if self.encoder_manager is not None:
+                    self.encoder_manager.start_encoding(output_path)
+                self.recording_started.emit(str(output_path))
+                return True
+            except Exception as e:
+                self.logger.error(f"Failed to start recording: {e}")
+                self.camera_error.emit(f"Recording failed: {e}")
+                return False
+
+    def stop_recording(self) -> None:
+        """Stop the encoder and let the container finalize."""
+        with self._lock:
+            self._stop_recording_locked()
+
+    def _stop_recording_locked(self) -> None:
+        """stop_recording body; caller holds the lock."""
+        if not self.is_recording:
+            return
+        try:
+            self.camera.stop_encoder()
+        except Exception as e:
+            self.logger.error(f"Encoder stop failed: {e}")
+        self.is_recording = False
+        if self.encoder_manager is not None:
+            self.encoder_manager.stop_encoding()
+        if self.current_output_path is not None:
+            self.recording_stopped.emit(str(self.current_output_path))
+        self.current_output_path = None
+        self.stop_complete_event.set()
+
+    def get_camera_stats(self) -> dict:
+        """Return the latest sensor metadata cached by the frame callback."""
+        if not self.is_previewing:
+            return {}
+        metadata = self._latest_metadata
+        if not metadata:
+            return {}
+        return {
+            "exposure_us": metadata.get("ExposureTime", 0),
+            "analogue_gain": metadata.get("AnalogueGain", 0.0),
+            "lux": metadata.get("Lux", 0.0),
+            "sensor_temp": metadata.get("SensorTemperature", 0.0),
+            "frame_duration": metadata.get("FrameDuration", 0),
+        }
+
+    def _update_stats(self) -> None:
+        """Timer slot: publish camera stats to the UI."""
+        if self.receivers(self.camera_stats_updated) == 0:
+            return
+        stats = self.get_camera_stats()
+        if stats:
+            self.camera_stats_updated.emit(stats)
+
+    def close_camera(self) -> None:
+        """Stop everything and release the camera."""
+        with self._lock:
+            self._stop_recording_locked()
+            self._stop_preview_locked()
+            if self.camera is not None:
+                try:
+                    self.camera.close()
+                except Exception as e:
+                    self.logger.debug(f"Camera close failed: {e}")
+                self.camera = None
+        self.logger.info("Camera closed")
+
+    def __enter__(self) -> "CameraManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close_camera()
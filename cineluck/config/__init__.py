@@ -0,0 +1,5 @@
+"""Configuration package for CineLuck."""
+
+from .manager import ConfigManager, DEFAULT_CONFIG
+
+__all__ = ["ConfigManager", "DEFAULT_CONFIG"]
@@ -0,0 +1,150 @@
+"""Configuration management for CineLuck.
+
+Settings are stored as JSON under ~/.config/CineLuck and loaded on
+startup. Unknown keys fall back to the defaults table so older config
+files keep working after upgrades.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    # Recording
+    "frame_rate": 25,
+    "frame_rates": [24, 25, 30, 50, 60],
+    "codec": "h264",
+    "container": "mkv",
+    "bitrate": 30_000_000,
+    "recording_dir": "~/Movies/CineLuck",
+    # Exposure
+    "auto_exposure": True,
+    "shutter_speed_us": 20000,
+    "iso_value": 100,
+    "metering_mode": "average",
+    "anti_flicker": "off",
+    # White balance / colour
+    "auto_white_balance": True,
+    "color_temperature": 3200,
+    "tint": 0,
+    "contrast": 0,
+    "saturation": 0,
+    "sharpness": 0,
+    # Audio
+    "audio_enabled": True,
+    "audio_device": None,
+    "input_gain": 1.0,
+    "sample_rate": 48000,
+    "audio_bitrate": 192_000,
+    # Preview
+    "preview_fps": 30,
+    # System
+    "thermal_throttle_temp": 70,
+    "min_free_space_gb": 2.0,
+}
+
+
+class ConfigManager:
+    """Loads, saves and serves application settings."""
+
+    def __init__(self, config_dir: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.config_dir = Path(config_dir) if config_dir else Path.home() / ".config" / "CineLuck"
+        self.config_path = self.config_dir / "config.json"
+        self._config: Dict[str, Any] = dict(DEFAULT_CONFIG)
+        self._listeners = []
+        self._load()
+
+    def _load(self) -> None:
+        """Read the config file, keeping defaults for missing keys."""
+        try:
+            if self.config_path.exists():
+                with open(self.config_path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                self._config.update(stored)
+                self.logger.info(f"Loaded config from {self.config_path}")
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"Failed to load config, using defaults: {e}")
+
+    def save(self) -> bool:
+        """Write the current settings to disk."""
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.config_path, "w", encoding="utf-8") as f:
+                json.dump(self._config, f, indent=2)
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to save config: {e}")
+            return False
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for *key*, or *default* if unset."""
+        return self._config.get(key, default)
+
+    def snapshot(self, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return a plain-dict copy of the settings (or just *keys*).
+
+        Callers that read several keys in one pass should take a snapshot
+        and index locally rather than issuing a get() per key.
+        """
+        if keys is None:
+            return dict(self._config)
+        get = self._config.get
+        return {key: get(key) for key in keys}
+
+    def set(self, key: str, value: Any) -> None:
+        """Set *key* to *value* and persist immediately."""
+        self._config[key] = value
+        self.save()
+        self._notify_change(key, value)
+
+    def update(self, values: Dict[str, Any]) -> None:
+        """Set several keys with a single save.
+
+        Equivalent to set() per key but serializes and writes the file
+        once; listeners are still notified per key so cached attributes
+        stay coherent.
+        """
+        self._config.update(values)
+        self.save()
+        for key, value in values.items():
+            self._notify_change(key, value)
+
+    def add_change_listener(self, callback) -> None:
+        """Register ``callback(key, value)`` to run after every change.
+
+        Lets consumers cache hot keys as attributes instead of re-reading
+        them through get() on every use.
+        """
+        self._listeners.append(callback)
+
+    def _notify_change(self, key: str, value: Any) -> None:
+        for callback in self._listeners:
+            try:
+                callback(key, value)
+            except Exception as e:
+                self.logger.error(f"Config change listener failed: {e}")
+
+    def export_profile(self, path: Path) -> bool:
+        """Export the current settings to an external JSON file."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._config, f, indent=2)
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to export profile: {e}")
+            return False
+
+    def import_profile(self, path: Path) -> bool:
+        """Replace current settings with those from an external file."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                imported = json.load(f)
+            self._config = dict(DEFAULT_CONFIG)
+            self._config.update(imported)
+            return self.save()
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"Failed to import profile: {e}")
+            return False
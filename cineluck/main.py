@@ -0,0 +1,86 @@
+"""Application entry point: logging, signal handling and the Qt event loop."""
+
+import logging
+import logging.handlers
+import os
+import signal
+import sys
+from pathlib import Path
+
+from PyQt6.QtCore import QSocketNotifier
+from PyQt6.QtWidgets import QApplication
+
+from .app import CineLuckApp
+
+
+LOG_PATH = Path.home() / ".config" / "CineLuck" / "run.log"
+LOG_TAIL_LINES = 100
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """Configure console + file logging, trimming the file to its tail."""
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    # Keep only the last N lines from the previous run.
+    try:
+        if LOG_PATH.exists():
+            lines = LOG_PATH.read_text(encoding="utf-8", errors="replace").splitlines()
+            if len(lines) > LOG_TAIL_LINES:
+                LOG_PATH.write_text("\n".join(lines[-LOG_TAIL_LINES:]) + "\n",
+                                    encoding="utf-8")
+    except OSError:
+        pass
+
+    formatter = logging.Formatter(
+        "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+    )
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    file_handler = logging.FileHandler(LOG_PATH, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    # SD-card writes stall; batch records in memory and only hit the
+    # card every 64 records or immediately on WARNING and above.
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=64, flushLevel=logging.WARNING, target=file_handler
+    )
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(stream_handler)
+    root.addHandler(buffered_handler)
+
+
+def main() -> int:
+    """Run the CineLuck application."""
+    setup_logging()
+    logger = logging.getLogger(__name__)
+
+    app = QApplication(sys.argv)
+    app.setApplicationName("CineLuck")
+    # No HighDPI attributes: Qt 6 scales unconditionally and the old
+    # AA_EnableHighDpiScaling/AA_UseHighDpiPixmaps calls were no-ops
+    # that only produced deprecation warnings.
+
+    # Wake the Qt event loop directly when a signal arrives instead of
+    # running Python code from signal context: the C-level handler writes
+    # the signal number to the pipe and the notifier quits from the loop.
+    rfd, wfd = os.pipe()
+    os.set_blocking(wfd, False)
+    signal.set_wakeup_fd(wfd)
+    signal.signal(signal.SIGINT, lambda signum, frame: None)
+
+    def handle_signal_fd(fd):
+        os.read(fd, 64)
+        logger.info("SIGINT received, quitting")
+        app.quit()
+
+    notifier = QSocketNotifier(rfd, QSocketNotifier.Type.Read)
+    notifier.activated.connect(handle_signal_fd)
+
+    window = CineLuckApp()
+    window.show()
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""State management package for CineLuck."""
+
+from .machine import CameraState, StateMachine, SafeStopManager
+
+__all__ = ["CameraState", "StateMachine", "SafeStopManager"]
@@ -0,0 +1,607 @@
+"""Finite state machine for camera lifecycle management.
+
+States follow the recording lifecycle described in the project spec:
+Idle -> Preview -> Recording -> Stopping -> Preview, with Error reachable
+from anywhere. A watchdog restarts the preview if frames stall, and the
+SafeStopManager drains the encoder before finalizing the container.
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+import weakref
+from enum import IntEnum
+
+# Qt base selection is explicit, not inferred from import order: PyQt6
+# importable -> signal-backed base; PyQt6 missing, or CINELUCK_NO_QT set
+# (for headless tools and tests that must not load Qt) -> callback
+# fallback. The old sys.modules sniff baked in whichever base won the
+# import race, so touching cineluck.state before PyQt6 silently broke a
+# later CineLuckApp at its first .connect call.
+if os.environ.get("CINELUCK_NO_QT"):
+    QT_AVAILABLE = False
+else:
+    try:
+        from PyQt6.QtCore import (
+            Q_ARG, QMetaObject, QObject, QRunnable, QThreadPool, Qt,
+            pyqtSignal, pyqtSlot,
+        )
+        QT_AVAILABLE = True
+    except ImportError:
+        QT_AVAILABLE = False
+
+if QT_AVAILABLE:
+
+    class _StopTask(QRunnable):
+        """Runs the safe-stop sequence on a pooled thread.
+
+        Same pattern as the encoder's hardware probe: the global pool
+        recycles its OS threads, so repeated stops skip the several-ms
+        thread spawn a fresh threading.Thread pays per invocation.
+        """
+
+        def __init__(self, worker):
+            super().__init__()
+            self._worker = worker
+
+        def run(self):
+            self._worker()
+
+else:
+
+    def pyqtSlot(*_args, **_kwargs):
+        """No-op stand-in so slot declarations parse without Qt."""
+        def decorator(func):
+            return func
+        return decorator
+
+
+class _Scheduler(threading.Thread):
+    """One daemon thread serving every deferred state-machine callback.
+
+    threading.Timer spawns a fresh OS thread per arm — about a
+    millisecond plus a stack on a Pi, paid on every watchdog reset. A
+    single heap-ordered thread serves all deadlines instead; entries are
+    cancelled by flipping a flag so no heap surgery is needed.
+    """
+
+    def __init__(self):
+        super().__init__(name="state-scheduler", daemon=True)
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = 0
+        self.start()
+
+    def schedule(self, delay: float, callback):
+        """Run *callback* after *delay* seconds; returns a cancel token."""
+        entry = [callback, True]
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, entry))
+            self._cond.notify()
+        return entry
+
+    @staticmethod
+    def cancel(token) -> None:
+        """Mark a scheduled entry dead; it is dropped when it surfaces."""
+        if token is not None:
+            token[1] = False
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                deadline, _, entry = self._heap[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                callback, live = entry
+            if live:
+                try:
+                    callback()
+                except Exception:
+                    logging.getLogger(__name__).exception("Scheduled callback failed")
+
+
+# Process-wide scheduler, created on first use (double-checked, same
+# pattern as the encoder's hardware-probe cache).
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def _scheduler() -> _Scheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                _SCHEDULER = _Scheduler()
+    return _SCHEDULER
+
+
+class CameraState(IntEnum):
+    """High-level camera lifecycle states.
+
+    IntEnum: members hash and compare as plain ints (one C op), and the
+    ordinal doubles as an index into the transition table.
+    """
+
+    IDLE = 0
+    PREVIEW = 1
+    RECORDING = 2
+    STOPPING = 3
+    ERROR = 4
+
+    @property
+    def label(self) -> str:
+        """Lowercase display name for logs and the UI."""
+        # Memoized below: name.lower() allocated a fresh string on
+        # every log line that mentions a state.
+        return _STATE_LABELS[self]
+
+
+_STATE_LABELS = {state: state.name.lower() for state in CameraState}
+
+_N_STATES = len(CameraState)
+
+
+class StopPhase(IntEnum):
+    """Machine-readable safe-stop phases, ordered by progress.
+
+    Emitted alongside the human-readable stop_progress text so the UI
+    can dispatch on an int instead of scanning message substrings.
+    """
+
+    STARTED = 0
+    DRAINING = 1
+    FINALIZING = 2
+    CAMERA = 3
+    RETURNING = 4
+    DONE = 5
+
+
+def _compile_transition_bits(table) -> int:
+    """Pack a {state: frozenset} transition graph into one int bitmap."""
+    bits = 0
+    for old, dests in table.items():
+        for new in dests:
+            bits |= 1 << (old * _N_STATES + new)
+    return bits
+
+
+if QT_AVAILABLE:
+
+    class BaseStateMachine(QObject):
+        """Qt-backed signal base used when PyQt6 is importable."""
+
+        state_changed = pyqtSignal(object, object)  # (new_state, old_state)
+        error_occurred = pyqtSignal(str)
+        stop_progress = pyqtSignal(str)
+        stop_phase = pyqtSignal(int)  # StopPhase ordinal
+        stop_completed = pyqtSignal(bool)
+
+        def __init__(self):
+            super().__init__()
+            # Resolving .emit on an unbound signal goes through the sip
+            # descriptor machinery on every access; cache the bound
+            # emitters once so hot call sites pay one attribute load.
+            self.emit_state_changed = self.state_changed.emit
+            self.emit_error = self.error_occurred.emit
+            self.emit_stop_progress = self.stop_progress.emit
+            self.emit_stop_phase = self.stop_phase.emit
+            self.emit_stop_completed = self.stop_completed.emit
+
+else:
+
+    class BaseStateMachine:
+        """Callback-based fallback for headless/CLI use without PyQt6.
+
+        Callbacks are held weakly: a bound method on a destroyed consumer
+        auto-evicts instead of leaking and slowing every emit, matching
+        Qt's behaviour when a receiver QObject is deleted.
+        """
+
+        __slots__ = ("_signal_callbacks",)
+
+        def __init__(self):
+            self._signal_callbacks = {
+                "state_changed": [],
+                "error_occurred": [],
+                "stop_progress": [],
+                "stop_phase": [],
+                "stop_completed": [],
+            }
+
+        @staticmethod
+        def _weak(callback):
+            if hasattr(callback, "__self__"):
+                return weakref.WeakMethod(callback)
+            return weakref.ref(callback)
+
+        def connect_state_changed(self, callback):
+            self._signal_callbacks["state_changed"].append(self._weak(callback))
+
+        def connect_error_occurred(self, callback):
+            self._signal_callbacks["error_occurred"].append(self._weak(callback))
+
+        def _emit(self, name, *args):
+            refs = self._signal_callbacks[name]
+            dead = False
+            for ref in refs:
+                callback = ref()
+                if callback is None:
+                    dead = True
+                    continue
+                try:
+                    callback(*args)
+                except Exception as e:
+                    logging.getLogger(__name__).error("%s callback failed: %s", name, e)
+            if dead:
+                refs[:] = [ref for ref in refs if ref() is not None]
+
+        def emit_state_changed(self, new_state, old_state):
+            self._emit("state_changed", new_state, old_state)
+
+        def emit_error(self, message):
+            self._emit("error_occurred", message)
+
+        def emit_stop_progress(self, message):
+            self._emit("stop_progress", message)
+
+        def emit_stop_phase(self, phase):
+            self._emit("stop_phase", phase)
+
+        def emit_stop_completed(self, success):
+            self._emit("stop_completed", success)
+
+
+class StateMachine(BaseStateMachine):
+    """Tracks the camera lifecycle and guards transitions between states."""
+
+    if not QT_AVAILABLE:
+        # Slot storage turns the per-frame attribute reads (watchdog
+        # resets touch _current_state and _watchdog_token constantly)
+        # into fixed offsets and halves instance size. QObject manages
+        # its own storage, so the Qt build keeps the plain __dict__.
+        __slots__ = (
+            "logger", "_lock", "_current_state", "_state_entered_ns",
+            "_watchdog_token", "_watchdog_deadline",
+            "_watchdog_timeout", "_retry_count",
+            "_max_retries", "_recovery_pending",
+            "_enter_actions", "_transition_handlers",
+        )
+
+    # Frozensets built once at class load: O(1) membership in the hot
+    # transition path, and immutability means readers need no lock.
+    VALID_TRANSITIONS = {
+        CameraState.IDLE: frozenset({CameraState.PREVIEW, CameraState.ERROR}),
+        CameraState.PREVIEW: frozenset({CameraState.RECORDING, CameraState.IDLE, CameraState.ERROR}),
+        CameraState.RECORDING: frozenset({CameraState.STOPPING, CameraState.ERROR}),
+        CameraState.STOPPING: frozenset({CameraState.PREVIEW, CameraState.IDLE, CameraState.ERROR}),
+        CameraState.ERROR: frozenset({CameraState.IDLE, CameraState.PREVIEW}),
+    }
+
+    # The whole 5x5 graph packed into one integer at class load; validity
+    # is a shift and a mask — no container lookup at all. The dict above
+    # stays as the readable source of truth.
+    _VALID_BITS = _compile_transition_bits(VALID_TRANSITIONS)
+
+    def __init__(self, watchdog_timeout: float = 5.0):
+        super().__init__()
+        self.logger = logging.getLogger(__name__)
+        # Plain Lock: no locked section re-enters another since the
+        # validity check was inlined into transition_to.
+        self._lock = threading.Lock()
+        self._current_state = CameraState.IDLE
+        self._state_entered_ns = time.monotonic_ns()
+        self._watchdog_token = None
+        self._watchdog_deadline = 0.0
+        self._watchdog_timeout = watchdog_timeout
+        self._retry_count = 0
+        self._max_retries = 3
+        self._recovery_pending = False
+        # Enter actions as a slot list indexed by state ordinal: most
+        # transitions have no handler and a list load beats a dict probe.
+        # Transition handlers use the same flattened (old, new) index as
+        # the validity bitmap, so the hot path allocates no key tuple.
+        self._enter_actions = [None] * len(CameraState)
+        self._transition_handlers = [None] * (_N_STATES * _N_STATES)
+
+    @property
+    def current_state(self) -> CameraState:
+        # Lock-free: a single attribute load is atomic under the GIL and
+        # writers publish the new state with one assignment, so readers
+        # always see a consistent value. The UI and watchdog poll this
+        # every frame — an acquire/release pair per read was pure
+        # contention against the transition path.
+        return self._current_state
+
+    def is_state(self, state: CameraState) -> bool:
+        """Return True if the machine is currently in *state*."""
+        return self._current_state == state
+
+    def can_transition_to(self, new_state: CameraState) -> bool:
+        """Return True if a transition to *new_state* is currently legal.
+
+        Lock-free and branch-free: the bitmap is immutable and the state
+        read is a single atomic attribute load.
+        """
+        return bool((self._VALID_BITS >> (self._current_state * _N_STATES + new_state)) & 1)
+
+    def register_state_handler(self, state: CameraState, handler) -> None:
+        """Register a callable invoked whenever *state* is entered."""
+        self._enter_actions[state] = handler
+        self.logger.debug("Registered state handler for %s", state.label)
+
+    def register_transition_handler(self, from_state: CameraState, to_state: CameraState, handler) -> None:
+        """Register a callable invoked on the specific transition."""
+        self._transition_handlers[from_state * _N_STATES + to_state] = handler
+        self.logger.debug("Registered transition handler %s -> %s", from_state.label, to_state.label)
+
+    def transition_to(self, new_state: CameraState, force: bool = False) -> bool:
+        """Attempt a transition; returns True on success."""
+        with self._lock:
+            old_state = self._current_state
+            # Inline validity check against the local read: no extra
+            # method call, and old_state is guaranteed consistent with
+            # the state we are about to replace. The flattened index is
+            # shared with the transition-handler table below.
+            index = old_state * _N_STATES + new_state
+            if not force and not (self._VALID_BITS >> index) & 1:
+                self.logger.warning(
+                    "Invalid transition: %s -> %s", old_state.label, new_state.label
+                )
+                return False
+
+            self._current_state = new_state
+            self._state_entered_ns = time.monotonic_ns()
+            self.logger.info("State transition: %s -> %s", old_state.label, new_state.label)
+
+            handler = self._transition_handlers[index]
+            if handler is not None:
+                try:
+                    handler()
+                except Exception as e:
+                    self.logger.error("Transition handler failed: %s", e)
+
+            handler = self._enter_actions[new_state]
+            if handler is not None:
+                try:
+                    handler()
+                except Exception as e:
+                    self.logger.error("State handler failed: %s", e)
+
+            if new_state in (CameraState.PREVIEW, CameraState.RECORDING):
+                self._start_watchdog()
+            else:
+                self._stop_watchdog()
+
+        # Forced self-transitions change nothing observers care about.
+        if new_state is not old_state:
+            self.emit_state_changed(new_state, old_state)
+        return True
+
+    def get_state_duration(self) -> float:
+        """Return seconds spent in the current state.
+
+        monotonic_ns: immune to NTP steps on a headless Pi, and the read
+        is a single atomic 64-bit load so no lock is needed.
+        """
+        return (time.monotonic_ns() - self._state_entered_ns) * 1e-9
+
+    def _start_watchdog(self) -> None:
+        """(Re)arm the stall watchdog.
+
+        Rearming is one attribute store: the old cancel-and-reschedule
+        pushed a fresh heap entry and woke the scheduler thread for
+        every preview frame. A single entry now stays scheduled for the
+        life of the armed period and re-checks the bumped deadline when
+        it surfaces.
+        """
+        self._watchdog_deadline = time.monotonic() + self._watchdog_timeout
+        if self._watchdog_token is None:
+            self._watchdog_token = _scheduler().schedule(
+                self._watchdog_timeout, self._watchdog_fire
+            )
+            self.logger.debug("Watchdog armed (%ss)", self._watchdog_timeout)
+
+    def _stop_watchdog(self) -> None:
+        _Scheduler.cancel(self._watchdog_token)
+        self._watchdog_token = None
+
+    def _watchdog_fire(self) -> None:
+        remaining = self._watchdog_deadline - time.monotonic()
+        if remaining > 0:
+            # Deadline was bumped since this entry was scheduled; sleep
+            # out the remainder instead of firing.
+            self._watchdog_token = _scheduler().schedule(remaining, self._watchdog_fire)
+            return
+        self._watchdog_token = None
+        self._watchdog_timeout_handler()
+
+    def reset_watchdog(self) -> None:
+        """Called on every delivered preview frame to signal liveness.
+
+        Pure housekeeping: only the deadline moves, no state changed, so
+        nothing is emitted — the old self-to-self state_changed ping
+        pushed a no-op through the Qt meta-object for every receiver on
+        every frame.
+        """
+        if self._current_state in (CameraState.PREVIEW, CameraState.RECORDING):
+            self._start_watchdog()
+
+    def _watchdog_timeout_handler(self) -> None:
+        state = self._current_state
+        self.logger.warning("Watchdog timeout in state %s", state.label)
+        if state in (CameraState.PREVIEW, CameraState.RECORDING):
+            self._handle_error("Preview stalled (watchdog timeout)")
+
+    def _handle_error(self, message: str) -> None:
+        """Enter the ERROR state and schedule a recovery attempt."""
+        with self._lock:
+            old_state = self._current_state
+            self._current_state = CameraState.ERROR
+            self._state_entered_ns = time.monotonic_ns()
+            self._stop_watchdog()
+        self.emit_error(message)
+        # Snapshot-then-write: the old emit read _current_state after the
+        # mutation and reported ERROR -> ERROR to every observer.
+        if old_state is not CameraState.ERROR:
+            self.emit_state_changed(CameraState.ERROR, old_state)
+        self.logger.error("Camera error: %s", message)
+        # One pending recovery at a time: an error storm (e.g. a camera
+        # disconnect burst) must not queue a recovery per error.
+        if self._retry_count < self._max_retries and not self._recovery_pending:
+            self._recovery_pending = True
+            _scheduler().schedule(2.0, self._attempt_recovery)
+
+    def _attempt_recovery(self) -> None:
+        """Try to leave the ERROR state by returning to preview."""
+        with self._lock:
+            self._recovery_pending = False
+            self._retry_count += 1
+            self.logger.info(
+                "Recovery attempt %d/%d", self._retry_count, self._max_retries
+            )
+        if self.transition_to(CameraState.IDLE):
+            self.transition_to(CameraState.PREVIEW)
+            self._retry_count = 0
+
+    def force_idle(self) -> None:
+        """Unconditionally return the machine to IDLE (used on shutdown)."""
+        # Already idle with nothing to reset: emitting here would
+        # dispatch into observers that may be half-destroyed widgets
+        # during application teardown.
+        if self._current_state is CameraState.IDLE and self._retry_count == 0:
+            return
+        with self._lock:
+            self._stop_watchdog()
+            self._retry_count = 0
+            old_state = self._current_state
+            self._current_state = CameraState.IDLE
+            self._state_entered_ns = time.monotonic_ns()
+        if old_state is not CameraState.IDLE:
+            self.emit_state_changed(CameraState.IDLE, old_state)
+
+    def shutdown(self) -> None:
+        """Stop timers and return to IDLE for application exit."""
+        self.force_idle()
+        self._stop_watchdog()
+        self.logger.info("State machine shut down")
+
+
+class SafeStopManager(BaseStateMachine):
+    """Coordinates the safe-stop sequence: drain, finalize, back to preview."""
+
+    def __init__(self, state_machine, camera_manager=None, encoder_manager=None,
+                 verbose: bool = False):
+        super().__init__()
+        self.logger = logging.getLogger(__name__)
+        self.state_machine = state_machine
+        self.camera_manager = camera_manager
+        self.encoder_manager = encoder_manager
+        self._stop_in_progress = False
+        # Progress coalescing: the worker can step through several
+        # phases within one frame and the dialog only shows the newest
+        # label, so intermediate messages are last-one-wins with one
+        # flush per paint interval. verbose=True emits every message
+        # directly (useful when debugging the stop sequence).
+        self.verbose = verbose
+        self._latest_progress = None
+        self._flush_pending = False
+
+    def _report_progress(self, message: str, phase: StopPhase) -> None:
+        """Publish a progress update, coalescing rapid emissions."""
+        if self.verbose:
+            self.emit_stop_phase(phase)
+            self.emit_stop_progress(message)
+            return
+        self._latest_progress = (message, phase)
+        if not self._flush_pending:
+            self._flush_pending = True
+            _scheduler().schedule(0.016, self._flush_progress)
+
+    def _flush_progress(self) -> None:
+        self._flush_pending = False
+        latest, self._latest_progress = self._latest_progress, None
+        if latest is not None:
+            message, phase = latest
+            # Phase first so observers reacting to the code see the
+            # matching text when they next read the label.
+            self.emit_stop_phase(phase)
+            self.emit_stop_progress(message)
+
+    @pyqtSlot(int)
+    def _transition_main(self, state: int) -> None:
+        """Slot target for transitions marshalled from the worker."""
+        self.state_machine.transition_to(CameraState(state))
+
+    def _transition_from_worker(self, state: CameraState) -> None:
+        """Run a transition on the GUI thread from the pooled worker.
+
+        Enter-action handlers registered by the UI touch widgets, so a
+        direct transition_to from the worker would run them on the
+        wrong thread. invokeMethod executes the slot on this object's
+        owning (GUI) thread and blocks until it returns, keeping the
+        worker's sequencing intact.
+        """
+        if QT_AVAILABLE:
+            QMetaObject.invokeMethod(
+                self, "_transition_main",
+                Qt.ConnectionType.BlockingQueuedConnection,
+                Q_ARG(int, int(state)),
+            )
+        else:
+            self.state_machine.transition_to(state)
+
+    def safe_stop_recording(self) -> bool:
+        """Kick off the safe-stop sequence on a background thread."""
+        if self._stop_in_progress:
+            self.logger.warning("Safe stop already in progress")
+            return False
+        self._stop_in_progress = True
+        if QT_AVAILABLE:
+            QThreadPool.globalInstance().start(_StopTask(self._safe_stop_worker))
+        else:
+            thread = threading.Thread(target=self._safe_stop_worker, daemon=True)
+            thread.start()
+        return True
+
+    def _safe_stop_worker(self) -> None:
+        try:
+            self._report_progress("Stopping recording...", StopPhase.STARTED)
+            self._transition_from_worker(CameraState.STOPPING)
+
+            # Wait on completion events with the old sleeps as upper
+            # bounds: a drain that finishes in 50 ms releases the worker
+            # in 50 ms instead of always costing the full window.
+            self._report_progress("Draining encoder...", StopPhase.DRAINING)
+            if self.encoder_manager is not None:
+                self.encoder_manager.drain_encoder()
+                self.encoder_manager.drain_event.wait(0.5)
+            else:
+                time.sleep(0.5)
+
+            self._report_progress("Finalizing container...", StopPhase.FINALIZING)
+            if self.camera_manager is not None:
+                self.camera_manager.stop_recording()
+                self.camera_manager.stop_complete_event.wait(0.2)
+            else:
+                time.sleep(0.2)
+
+            self._report_progress("Waiting on camera request...", StopPhase.CAMERA)
+            self._report_progress("Returning to preview...", StopPhase.RETURNING)
+            self._transition_from_worker(CameraState.PREVIEW)
+
+            self._report_progress("Safe stop completed", StopPhase.DONE)
+            self._flush_progress()
+            self.emit_stop_completed(True)
+        except Exception as e:
+            self.logger.error("Safe stop failed: %s", e)
+            self.emit_stop_completed(False)
+        finally:
+            self._stop_in_progress = False
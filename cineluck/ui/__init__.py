@@ -0,0 +1,10 @@
+"""UI package for CineLuck."""
+
+from .widgets import TopBar, BottomBar, PreviewArea
+from .panels import ColorPanel, ExposurePanel
+from .dialogs import SafeStopDialog
+
+__all__ = [
+    "TopBar", "BottomBar", "PreviewArea",
+    "ColorPanel", "ExposurePanel", "SafeStopDialog",
+]
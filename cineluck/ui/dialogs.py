@@ -0,0 +1,134 @@
+"""Modal dialogs, primarily the Safe Stop progress dialog."""
+
+import logging
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import (
+    QDialog, QLabel, QProgressBar, QPushButton, QVBoxLayout,
+)
+
+from ..state.machine import StopPhase
+
+
+# Stylesheets as module constants: Qt re-tokenizes the CSS on every
+# setStyleSheet call, so build each string once instead of inside
+# every dialog construction.
+_DIALOG_QSS = """
+    QDialog { background-color: #2a2a2a; color: #eee; }
+    QLabel { font-size: 14px; }
+    QProgressBar { border: 1px solid #555; background: #1a1a1a; }
+    QProgressBar::chunk { background-color: #44aa44; }
+"""
+
+_FORCE_STOP_QSS = """
+    QPushButton { background-color: #aa3333; color: white;
+                  border-radius: 4px; min-height: 40px; }
+    QPushButton:pressed { background-color: #cc4444; }
+"""
+
+
+class SafeStopDialog(QDialog):
+    """Blocks input while the safe-stop sequence drains and finalizes."""
+
+    SIMULATION_STEPS = [
+        ("Stopping recording...", StopPhase.STARTED),
+        ("Draining encoder...", StopPhase.DRAINING),
+        ("Finalizing container...", StopPhase.FINALIZING),
+        ("Waiting on camera request...", StopPhase.CAMERA),
+        ("Returning to preview...", StopPhase.RETURNING),
+        ("Safe stop completed", StopPhase.DONE),
+    ]
+
+    def __init__(self, safe_stop_manager=None, parent=None, simulate=False):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.safe_stop_manager = safe_stop_manager
+        # Demo/bench mode only, and only when no real manager is wired:
+        # the scripted walk adds 4.8 s of artificial latency, which must
+        # never sit on the production stop path.
+        self._simulate = simulate and safe_stop_manager is None
+        self.simulation_timer = None
+        self._simulation_step = 0
+        self._setup_ui()
+
+        if self.safe_stop_manager is not None:
+            self.safe_stop_manager.stop_progress.connect(self._update_progress)
+            self.safe_stop_manager.stop_phase.connect(self._handle_phase)
+            self.safe_stop_manager.stop_completed.connect(self._handle_completed)
+
+    def _setup_ui(self) -> None:
+        self.setWindowTitle("Safe Stop")
+        self.setModal(True)
+        self.setFixedSize(420, 180)
+        self.setWindowFlag(Qt.WindowType.WindowCloseButtonHint, False)
+        self.setStyleSheet(_DIALOG_QSS)
+
+        layout = QVBoxLayout(self)
+
+        self.status_label = QLabel("Stopping recording...")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.status_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, len(self.SIMULATION_STEPS))
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.force_stop_button = QPushButton("Force stop")
+        self.force_stop_button.setStyleSheet(_FORCE_STOP_QSS)
+        self.force_stop_button.clicked.connect(self._handle_force_stop)
+        layout.addWidget(self.force_stop_button)
+
+    def show(self) -> None:
+        """Show the dialog; in simulate mode, run the scripted walk."""
+        self._simulation_step = 0
+        self.progress_bar.setValue(0)
+        if self._simulate:
+            self._start_safe_stop_simulation()
+        super().show()
+
+    def _start_safe_stop_simulation(self) -> None:
+        """Walk the static step list on a timer (demo/bench mode)."""
+        self.simulation_timer = QTimer(self)
+        self.simulation_timer.setInterval(800)
+        self.simulation_timer.timeout.connect(self._simulation_tick)
+        self.simulation_timer.start()
+
+    def _simulation_tick(self) -> None:
+        if self._simulation_step >= len(self.SIMULATION_STEPS):
+            self.simulation_timer.stop()
+            self.accept()
+            return
+        message, phase = self.SIMULATION_STEPS[self._simulation_step]
+        self._update_progress(message)
+        self._handle_phase(phase)
+        self._simulation_step += 1
+
+    def _update_progress(self, status_message: str) -> None:
+        """Show the latest status text; logic lives in _handle_phase."""
+        self.status_label.setText(status_message)
+        self.progress_bar.setValue(self.progress_bar.value() + 1)
+
+    def _handle_phase(self, phase: int) -> None:
+        """Dispatch on the machine-readable phase code.
+
+        Ordered comparison rather than equality: progress emissions are
+        coalesced, so individual phases may be skipped.
+        """
+        if StopPhase.DRAINING <= phase < StopPhase.DONE:
+            self.force_stop_button.setEnabled(True)
+        elif phase == StopPhase.DONE:
+            self.accept()
+
+    def _handle_completed(self, success: bool) -> None:
+        if success:
+            self.accept()
+        else:
+            self.status_label.setText("Stop failed — check the log")
+            self.reject()
+
+    def _handle_force_stop(self) -> None:
+        self.logger.warning("Force stop requested")
+        if self.safe_stop_manager is not None and self.safe_stop_manager.camera_manager:
+            self.safe_stop_manager.camera_manager.stop_recording()
+        self.reject()
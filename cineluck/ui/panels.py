@@ -0,0 +1,563 @@
+"""Slide-in control panels: exposure (left) and white balance/colour (right)."""
+
+import functools
+import logging
+
+from PyQt6.QtCore import QSignalBlocker, Qt, QTimer
+from PyQt6.QtGui import QColor, QPalette
+from PyQt6.QtWidgets import (
+    QCheckBox, QComboBox, QGroupBox, QHBoxLayout, QLabel, QPushButton,
+    QSlider, QVBoxLayout, QWidget,
+)
+
+from ..state.machine import CameraState
+
+
+def _safe_slot(desc):
+    """Log-and-swallow wrapper for slots: an exception in a handler must
+    not unwind into the Qt event loop. One decorator replaces the
+    hand-written try/except/log block every handler used to carry."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                self.logger.error("%s: %s", desc, e)
+        return wrapper
+    return decorator
+
+
+class ColorPanel(QWidget):
+    """Right slide-in panel: white balance CCT/tint and colour adjustments."""
+
+    # Commit delay for slider drags: long enough to coalesce the burst of
+    # sliderMoved ticks a touch drag produces, short enough to feel live.
+    DEBOUNCE_MS = 50
+
+    # (cct, auto_mode) per preset, built once at class load instead of a
+    # dict literal per combobox change. "Manual" keeps the current slider
+    # value, so its cct is resolved in the handler.
+    _WB_PRESETS = {
+        "Auto": (None, True),
+        "Daylight": (5600, False),
+        "Cloudy": (6500, False),
+        "Tungsten": (3200, False),
+        "Fluorescent": (4200, False),
+        "Manual": (None, False),
+    }
+    _WB_PRESET_NAMES = tuple(_WB_PRESETS)
+
+    def __init__(self, config_manager, camera_manager, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.config_manager = config_manager
+        self.camera_manager = camera_manager
+        # Last text pushed to each value label: setText schedules a
+        # repaint even for identical content, so equal updates are
+        # filtered out Python-side before crossing into Qt.
+        self._label_cache = {}
+        # Commits are suppressed while the panel is hidden or a
+        # recording is in flight; the deferred work is replayed as one
+        # consolidated apply on the next show.
+        self._recording = False
+        self._pending_apply = False
+        self._setup_ui()
+        self._load_settings()
+
+    def _should_apply(self) -> bool:
+        return self.isVisible() and not self._recording
+
+    def _set_label_text(self, label, text: str) -> None:
+        if self._label_cache.get(label) != text:
+            self._label_cache[label] = text
+            label.setText(text)
+
+    def _setup_ui(self) -> None:
+        # Construction touches some thirty widgets; suspend updates so
+        # none of them schedules a paint before the panel is assembled.
+        self.setUpdatesEnabled(False)
+        try:
+            self._build_ui()
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def _build_ui(self) -> None:
+        self.setFixedWidth(280)
+        # Styling comes from the window-level stylesheet via object
+        # names; per-widget setStyleSheet forces Qt to re-parse CSS and
+        # rebuild the style cache for the whole subtree.
+        self.setObjectName("sidePanel")
+        # The panel covers its whole rect with solid #333, so Qt's
+        # pre-paint background erase is pure wasted bandwidth on the
+        # embedded display. Scoped to the panel itself: children keep
+        # the default behaviour to avoid subcontrol glitches.
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, True)
+        self.setAutoFillBackground(True)
+        palette = self.palette()
+        palette.setColor(QPalette.ColorRole.Window, QColor("#333333"))
+        self.setPalette(palette)
+
+        layout = QVBoxLayout(self)
+
+        header = QHBoxLayout()
+        title = QLabel("WB / Colour")
+        header.addWidget(title)
+        header.addStretch(1)
+        self.close_button = QPushButton("\N{MULTIPLICATION X}")
+        self.close_button.setFixedSize(40, 40)
+        self.close_button.setObjectName("closeBtn")
+        header.addWidget(self.close_button)
+        layout.addLayout(header)
+
+        wb_group = QGroupBox("White Balance")
+        wb_layout = QVBoxLayout(wb_group)
+
+        self.auto_wb_checkbox = QCheckBox("Auto white balance")
+        self.auto_wb_checkbox.toggled.connect(self._handle_auto_wb_toggle)
+        wb_layout.addWidget(self.auto_wb_checkbox)
+
+        self.wb_preset_combo = QComboBox()
+        self.wb_preset_combo.addItems(self._WB_PRESET_NAMES)
+        self.wb_preset_combo.currentTextChanged.connect(self._handle_wb_preset_change)
+        wb_layout.addWidget(self.wb_preset_combo)
+
+        self.cct_slider, self.cct_value_label = self._make_slider(
+            wb_layout, "Colour temperature", 2000, 8000, "3200 K",
+            self._handle_cct_change, self._commit_cct,
+        )
+        self.tint_slider, self.tint_value_label = self._make_slider(
+            wb_layout, "Tint", -50, 50, "0 (Neutral)",
+            self._handle_tint_change, self._commit_tint,
+        )
+        layout.addWidget(wb_group)
+
+        color_group = QGroupBox("Colour")
+        color_layout = QVBoxLayout(color_group)
+
+        self.contrast_slider, self.contrast_value_label = self._make_slider(
+            color_layout, "Contrast", -100, 100, "0",
+            self._handle_contrast_change, self._commit_contrast,
+        )
+        self.saturation_slider, self.saturation_value_label = self._make_slider(
+            color_layout, "Saturation", -100, 100, "0",
+            self._handle_saturation_change, self._commit_saturation,
+        )
+        self.sharpness_slider, self.sharpness_value_label = self._make_slider(
+            color_layout, "Sharpness", -100, 100, "0",
+            self._handle_sharpness_change, self._commit_sharpness,
+        )
+        layout.addWidget(color_group)
+
+        self.reset_button = QPushButton("Reset to defaults")
+        self.reset_button.setMinimumHeight(48)
+        self.reset_button.setObjectName("resetBtn")
+        self.reset_button.clicked.connect(self._reset_to_defaults)
+        layout.addWidget(self.reset_button)
+        layout.addStretch(1)
+
+        # Debounced commits: the sliderMoved handlers only refresh the
+        # label and restart the timer, so a drag performs one config
+        # write and one camera call 50 ms after the last tick. Releasing
+        # the slider commits immediately. sliderMoved (unlike
+        # valueChanged) fires only for interactive drags, so programmatic
+        # setValue calls never re-enter the handlers; paths that set
+        # values in code commit explicitly.
+        self._cct_timer = self._make_debounce(self._commit_cct)
+        self._tint_timer = self._make_debounce(self._commit_tint)
+        self._contrast_timer = self._make_debounce(self._commit_contrast)
+        self._saturation_timer = self._make_debounce(self._commit_saturation)
+        self._sharpness_timer = self._make_debounce(self._commit_sharpness)
+        self._debounce_timers = (
+            self._cct_timer, self._tint_timer, self._contrast_timer,
+            self._saturation_timer, self._sharpness_timer,
+        )
+
+    def _make_slider(self, parent_layout, title: str, minimum: int,
+                     maximum: int, initial_text: str, on_moved, on_released):
+        """Build one titled slider column and return (slider, value label).
+
+        The five colour sliders differ only in title, range, initial
+        label text and handler pair, so the construction lives here once.
+        """
+        column = QVBoxLayout()
+        column.addWidget(QLabel(title))
+        slider = QSlider(Qt.Orientation.Horizontal)
+        slider.setRange(minimum, maximum)
+        slider.sliderMoved.connect(on_moved)
+        slider.sliderReleased.connect(on_released)
+        column.addWidget(slider)
+        value_label = QLabel(initial_text)
+        column.addWidget(value_label)
+        parent_layout.addLayout(column)
+        return slider, value_label
+
+    def _make_debounce(self, commit) -> QTimer:
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(self.DEBOUNCE_MS)
+        timer.timeout.connect(commit)
+        return timer
+
+    def _load_settings(self) -> None:
+        """Reflect current config in the widgets.
+
+        Only the checkbox needs its signal blocked: slider handlers hang
+        off sliderMoved, which programmatic setValue never fires. The
+        blocker releases on scope exit and the camera gets one
+        consolidated apply.
+        """
+        cfg = self.config_manager.snapshot((
+            "auto_white_balance", "color_temperature", "tint",
+            "contrast", "saturation", "sharpness",
+        ))
+        auto_wb = cfg.get("auto_white_balance", True)
+        blocker = QSignalBlocker(self.auto_wb_checkbox)
+        self.auto_wb_checkbox.setChecked(auto_wb)
+        self.cct_slider.setValue(cfg.get("color_temperature", 3200))
+        self.tint_slider.setValue(cfg.get("tint", 0))
+        self.contrast_slider.setValue(cfg.get("contrast", 0))
+        self.saturation_slider.setValue(cfg.get("saturation", 0))
+        self.sharpness_slider.setValue(cfg.get("sharpness", 0))
+        del blocker
+        self.cct_slider.setEnabled(not auto_wb)
+        self.tint_slider.setEnabled(not auto_wb)
+        self._update_cct_label(self.cct_slider.value())
+        self._update_tint_label(self.tint_slider.value())
+        self._update_contrast_label(self.contrast_slider.value())
+        self._update_saturation_label(self.saturation_slider.value())
+        self._update_sharpness_label(self.sharpness_slider.value())
+        self._apply_to_camera()
+
+    def _apply_to_camera(self) -> None:
+        """Push the current widget state to the camera in one pass."""
+        auto_wb = self.auto_wb_checkbox.isChecked()
+        self.camera_manager.set_white_balance(
+            None if auto_wb else self.cct_slider.value(), auto_wb
+        )
+        self._apply_color_adjustments()
+
+    @_safe_slot("Auto WB toggle failed")
+    def _handle_auto_wb_toggle(self, checked: bool) -> None:
+        self.config_manager.set("auto_white_balance", checked)
+        self.cct_slider.setEnabled(not checked)
+        self.tint_slider.setEnabled(not checked)
+        self.camera_manager.set_white_balance(
+            self.cct_slider.value() if not checked else None, checked
+        )
+
+    @_safe_slot("WB preset change failed")
+    def _handle_wb_preset_change(self, preset_text: str) -> None:
+        cct, auto_mode = self._WB_PRESETS.get(preset_text, (None, True))
+        if cct is None and not auto_mode:  # Manual: keep the slider value
+            cct = self.cct_slider.value()
+        self.auto_wb_checkbox.setChecked(auto_mode)
+        if cct is not None:
+            # Programmatic setValue does not fire sliderMoved, so the
+            # label refresh and commit happen explicitly here.
+            self.cct_slider.setValue(cct)
+            self._update_cct_label(cct)
+            self._commit_cct()
+
+    def _handle_cct_change(self, value: int) -> None:
+        self._update_cct_label(value)
+        self._cct_timer.start()
+
+    def _handle_tint_change(self, value: int) -> None:
+        self._update_tint_label(value)
+        self._tint_timer.start()
+
+    def _handle_contrast_change(self, value: int) -> None:
+        self._update_contrast_label(value)
+        self._contrast_timer.start()
+
+    def _handle_saturation_change(self, value: int) -> None:
+        self._update_saturation_label(value)
+        self._saturation_timer.start()
+
+    def _handle_sharpness_change(self, value: int) -> None:
+        self._update_sharpness_label(value)
+        self._sharpness_timer.start()
+
+    @_safe_slot("CCT change failed")
+    def _commit_cct(self) -> None:
+        self._cct_timer.stop()
+        if not self._should_apply():
+            self._pending_apply = True
+            return
+        value = self.cct_slider.value()
+        self.config_manager.set("color_temperature", value)
+        if not self.auto_wb_checkbox.isChecked():
+            self.camera_manager.set_white_balance(value, False)
+
+    @_safe_slot("Tint change failed")
+    def _commit_tint(self) -> None:
+        self._tint_timer.stop()
+        if not self._should_apply():
+            self._pending_apply = True
+            return
+        self.config_manager.set("tint", self.tint_slider.value())
+
+    @_safe_slot("Contrast change failed")
+    def _commit_contrast(self) -> None:
+        self._contrast_timer.stop()
+        if not self._should_apply():
+            self._pending_apply = True
+            return
+        self.config_manager.set("contrast", self.contrast_slider.value())
+        self._apply_color_adjustments()
+
+    @_safe_slot("Saturation change failed")
+    def _commit_saturation(self) -> None:
+        self._saturation_timer.stop()
+        if not self._should_apply():
+            self._pending_apply = True
+            return
+        self.config_manager.set("saturation", self.saturation_slider.value())
+        self._apply_color_adjustments()
+
+    @_safe_slot("Sharpness change failed")
+    def _commit_sharpness(self) -> None:
+        self._sharpness_timer.stop()
+        if not self._should_apply():
+            self._pending_apply = True
+            return
+        self.config_manager.set("sharpness", self.sharpness_slider.value())
+        self._apply_color_adjustments()
+
+    def _apply_color_adjustments(self) -> None:
+        self.camera_manager.set_color_adjustments(
+            self.contrast_slider.value(),
+            self.saturation_slider.value(),
+            self.sharpness_slider.value(),
+        )
+
+    def _update_cct_label(self, value: int) -> None:
+        self._set_label_text(self.cct_value_label, f"{value} K")
+
+    def _update_tint_label(self, value: int) -> None:
+        if value == 0:
+            text = "0 (Neutral)"
+        elif value > 0:
+            text = f"+{value} (Magenta)"
+        else:
+            text = f"{value} (Green)"
+        self._set_label_text(self.tint_value_label, text)
+
+    def _update_contrast_label(self, value: int) -> None:
+        self._set_label_text(
+            self.contrast_value_label, f"{value:+d}" if value else "0"
+        )
+
+    def _update_saturation_label(self, value: int) -> None:
+        self._set_label_text(
+            self.saturation_value_label, f"{value:+d}" if value else "0"
+        )
+
+    def _update_sharpness_label(self, value: int) -> None:
+        self._set_label_text(
+            self.sharpness_value_label, f"{value:+d}" if value else "0"
+        )
+
+    def _reset_to_defaults(self) -> None:
+        """Return WB/colour settings to the safe defaults.
+
+        The checkbox signal is blocked so setChecked doesn't fire the
+        toggle handler; slider setValue is already inert since the
+        handlers hang off sliderMoved. Config and camera each get one
+        explicit pass at the end.
+        """
+        self.config_manager.update({
+            "auto_white_balance": True,
+            "color_temperature": 3200,
+            "tint": 0,
+            "contrast": 0,
+            "saturation": 0,
+            "sharpness": 0,
+        })
+        blocker = QSignalBlocker(self.auto_wb_checkbox)
+        # Eleven widget mutations in a row would each schedule a paint;
+        # suspend updates so the whole reset repaints once.
+        self.setUpdatesEnabled(False)
+        try:
+            self.auto_wb_checkbox.setChecked(True)
+            self.cct_slider.setValue(3200)
+            self.tint_slider.setValue(0)
+            self.contrast_slider.setValue(0)
+            self.saturation_slider.setValue(0)
+            self.sharpness_slider.setValue(0)
+            self.cct_slider.setEnabled(False)
+            self.tint_slider.setEnabled(False)
+            self._update_cct_label(3200)
+            self._update_tint_label(0)
+            self._update_contrast_label(0)
+            self._update_saturation_label(0)
+            self._update_sharpness_label(0)
+        finally:
+            self.setUpdatesEnabled(True)
+            self.update()
+        del blocker
+        self._apply_to_camera()
+
+    def _commit_all(self) -> None:
+        """One consolidated config + camera apply for replayed changes."""
+        self.config_manager.update({
+            "color_temperature": self.cct_slider.value(),
+            "tint": self.tint_slider.value(),
+            "contrast": self.contrast_slider.value(),
+            "saturation": self.saturation_slider.value(),
+            "sharpness": self.sharpness_slider.value(),
+        })
+        self._apply_to_camera()
+
+    def hideEvent(self, event) -> None:
+        # A hide mid-drag leaves debounce timers armed; stash the commit
+        # instead of letting it fire against a hidden panel.
+        for timer in self._debounce_timers:
+            if timer.isActive():
+                timer.stop()
+                self._pending_apply = True
+        super().hideEvent(event)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self._pending_apply:
+            self._pending_apply = False
+            self._commit_all()
+
+    def handle_state_change(self, new_state, old_state) -> None:
+        """Disable manual controls while a recording is in flight."""
+        self._recording = new_state == CameraState.RECORDING
+        self.reset_button.setEnabled(not self._recording)
+
+
+class ExposurePanel(QWidget):
+    """Left slide-in panel: shutter, gain/ISO, metering and anti-flicker."""
+
+    ISO_STEPS = ("100", "200", "400", "800", "1600", "3200")
+
+    def __init__(self, config_manager, camera_manager, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.config_manager = config_manager
+        self.camera_manager = camera_manager
+        self._setup_ui()
+        self._load_settings()
+
+    def _setup_ui(self) -> None:
+        self.setFixedWidth(280)
+        self.setObjectName("sidePanel")
+        # Same opaque-paint setup as ColorPanel: full-coverage solid fill.
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, True)
+        self.setAutoFillBackground(True)
+        palette = self.palette()
+        palette.setColor(QPalette.ColorRole.Window, QColor("#333333"))
+        self.setPalette(palette)
+
+        layout = QVBoxLayout(self)
+
+        header = QHBoxLayout()
+        header.addWidget(QLabel("Exposure"))
+        header.addStretch(1)
+        self.close_button = QPushButton("\N{MULTIPLICATION X}")
+        self.close_button.setFixedSize(40, 40)
+        self.close_button.setObjectName("closeBtn")
+        header.addWidget(self.close_button)
+        layout.addLayout(header)
+
+        exposure_group = QGroupBox("Exposure")
+        exposure_layout = QVBoxLayout(exposure_group)
+
+        self.auto_exposure_checkbox = QCheckBox("Auto exposure")
+        self.auto_exposure_checkbox.toggled.connect(self._handle_auto_exposure_toggle)
+        exposure_layout.addWidget(self.auto_exposure_checkbox)
+
+        shutter_layout = QVBoxLayout()
+        shutter_layout.addWidget(QLabel("Shutter (\N{MICRO SIGN}s)"))
+        self.shutter_slider = QSlider(Qt.Orientation.Horizontal)
+        self.shutter_slider.setRange(100, 40000)
+        self.shutter_slider.valueChanged.connect(self._handle_shutter_change)
+        shutter_layout.addWidget(self.shutter_slider)
+        self.shutter_value_label = QLabel("20000 \N{MICRO SIGN}s")
+        shutter_layout.addWidget(self.shutter_value_label)
+        exposure_layout.addLayout(shutter_layout)
+
+        iso_layout = QVBoxLayout()
+        iso_layout.addWidget(QLabel("ISO"))
+        self.iso_combo = QComboBox()
+        self.iso_combo.addItems(list(self.ISO_STEPS))
+        self.iso_combo.currentTextChanged.connect(self._handle_iso_change)
+        iso_layout.addWidget(self.iso_combo)
+        exposure_layout.addLayout(iso_layout)
+
+        layout.addWidget(exposure_group)
+
+        metering_group = QGroupBox("Metering")
+        metering_layout = QVBoxLayout(metering_group)
+        self.metering_combo = QComboBox()
+        self.metering_combo.addItems(["Average", "Center", "Spot"])
+        self.metering_combo.currentTextChanged.connect(self._handle_metering_change)
+        metering_layout.addWidget(self.metering_combo)
+
+        self.flicker_combo = QComboBox()
+        self.flicker_combo.addItems(["Off", "50 Hz", "60 Hz"])
+        self.flicker_combo.currentTextChanged.connect(self._handle_flicker_change)
+        metering_layout.addWidget(QLabel("Anti-flicker"))
+        metering_layout.addWidget(self.flicker_combo)
+        layout.addWidget(metering_group)
+        layout.addStretch(1)
+
+    def _load_settings(self) -> None:
+        # Blocked for the same reason as ColorPanel._load_settings: the
+        # handlers would re-write config and hit the camera per widget.
+        cfg = self.config_manager.snapshot(
+            ("auto_exposure", "shutter_speed_us", "iso_value")
+        )
+        auto_exposure = cfg.get("auto_exposure", True)
+        blockers = [QSignalBlocker(w) for w in (
+            self.auto_exposure_checkbox, self.shutter_slider, self.iso_combo,
+        )]
+        self.auto_exposure_checkbox.setChecked(auto_exposure)
+        self.shutter_slider.setValue(cfg.get("shutter_speed_us", 20000))
+        self.iso_combo.setCurrentText(str(cfg.get("iso_value", 100)))
+        del blockers
+        self.shutter_slider.setEnabled(not auto_exposure)
+        self.iso_combo.setEnabled(not auto_exposure)
+        self.shutter_value_label.setText(
+            f"{self.shutter_slider.value()} \N{MICRO SIGN}s"
+        )
+
+    @_safe_slot("Auto exposure toggle failed")
+    def _handle_auto_exposure_toggle(self, checked: bool) -> None:
+        self.config_manager.set("auto_exposure", checked)
+        self.shutter_slider.setEnabled(not checked)
+        self.iso_combo.setEnabled(not checked)
+        self.camera_manager._apply_camera_settings()
+
+    @_safe_slot("Shutter change failed")
+    def _handle_shutter_change(self, value: int) -> None:
+        self.shutter_value_label.setText(f"{value} \N{MICRO SIGN}s")
+        self.config_manager.set("shutter_speed_us", value)
+        if not self.auto_exposure_checkbox.isChecked():
+            self.camera_manager._apply_camera_settings()
+
+    @_safe_slot("ISO change failed")
+    def _handle_iso_change(self, text: str) -> None:
+        self.config_manager.set("iso_value", int(text))
+        if not self.auto_exposure_checkbox.isChecked():
+            self.camera_manager._apply_camera_settings()
+
+    @_safe_slot("Metering change failed")
+    def _handle_metering_change(self, text: str) -> None:
+        self.config_manager.set("metering_mode", text.lower())
+        self.camera_manager._apply_camera_settings()
+
+    @_safe_slot("Anti-flicker change failed")
+    def _handle_flicker_change(self, text: str) -> None:
+        self.config_manager.set("anti_flicker", text.lower().replace(" ", ""))
+        self.camera_manager._apply_camera_settings()
+
+    def handle_state_change(self, new_state, old_state) -> None:
+        """Lock exposure controls while recording."""
+        recording = new_state == CameraState.RECORDING
+        self.auto_exposure_checkbox.setEnabled(not recording)
@@ -0,0 +1,169 @@
+"""Core UI widgets: top status bar, bottom control bar and preview area."""
+
+import logging
+
+import numpy as np
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import (
+    QHBoxLayout, QLabel, QPushButton, QWidget,
+)
+
+from ..state.machine import CameraState
+
+
+class TopBar(QWidget):
+    """Status strip: FPS, shutter, gain/ISO, WB, free space, temperature."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        # Latest transition received while hidden, replayed on show.
+        self._pending_state = None
+        self.setFixedHeight(48)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 4, 8, 4)
+
+        self.fps_label = QLabel("25 fps")
+        self.shutter_label = QLabel("1/50")
+        self.iso_label = QLabel("ISO 100")
+        self.wb_label = QLabel("AWB")
+        self.space_label = QLabel("-- GB")
+        self.temp_label = QLabel("--\N{DEGREE SIGN}C")
+        self.timecode_label = QLabel("00:00:00:00")
+
+        for label in (self.fps_label, self.shutter_label, self.iso_label,
+                      self.wb_label, self.timecode_label, self.space_label,
+                      self.temp_label):
+            layout.addWidget(label)
+        layout.insertStretch(5, 1)
+
+    def update_system_status(self, temp: float, free_gb: float) -> None:
+        """Refresh temperature and free-space readouts."""
+        self.temp_label.setText(f"{temp:.0f}\N{DEGREE SIGN}C")
+        self.space_label.setText(f"{free_gb:.1f} GB")
+
+    def update_camera_stats(self, stats: dict) -> None:
+        """Refresh shutter/gain readouts from camera metadata."""
+        exposure_us = stats.get("exposure_us", 0)
+        if exposure_us:
+            self.shutter_label.setText(f"1/{int(1_000_000 / exposure_us)}")
+        gain = stats.get("analogue_gain", 0.0)
+        if gain:
+            self.iso_label.setText(f"ISO {int(gain * 100)}")
+
+    def handle_state_change(self, new_state, old_state) -> None:
+        """Tint the timecode red while recording."""
+        if not self.isVisible():
+            # Restyling a hidden bar is wasted work; only the latest
+            # transition matters, so keep that one for the next show.
+            self._pending_state = (new_state, old_state)
+            return
+        if new_state == CameraState.RECORDING:
+            self.timecode_label.setStyleSheet("color: #ff4444; font-weight: bold;")
+        else:
+            self.timecode_label.setStyleSheet("")
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self._pending_state is not None:
+            new_state, old_state = self._pending_state
+            self._pending_state = None
+            self.handle_state_change(new_state, old_state)
+
+
+class BottomBar(QWidget):
+    """Main control strip with the big record toggle and quick panels."""
+
+    record_toggled = pyqtSignal()
+    exposure_requested = pyqtSignal()
+    color_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self._pending_state = None
+        self.setFixedHeight(72)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 4, 8, 4)
+
+        self.exposure_button = QPushButton("EXP")
+        self.exposure_button.setMinimumSize(80, 56)
+        self.exposure_button.clicked.connect(self.exposure_requested.emit)
+
+        self.record_button = QPushButton("\N{BLACK CIRCLE} REC")
+        self.record_button.setMinimumSize(160, 56)
+        self.record_button.clicked.connect(self.record_toggled.emit)
+
+        self.color_button = QPushButton("WB")
+        self.color_button.setMinimumSize(80, 56)
+        self.color_button.clicked.connect(self.color_requested.emit)
+
+        layout.addWidget(self.exposure_button)
+        layout.addStretch(1)
+        layout.addWidget(self.record_button)
+        layout.addStretch(1)
+        layout.addWidget(self.color_button)
+
+    def handle_state_change(self, new_state, old_state) -> None:
+        """Swap the record button between start/stop appearance."""
+        if not self.isVisible():
+            self._pending_state = (new_state, old_state)
+            return
+        if new_state == CameraState.RECORDING:
+            self.record_button.setText("\N{BLACK SQUARE} STOP")
+            self.record_button.setStyleSheet("background-color: #cc2222; color: white;")
+        elif new_state == CameraState.STOPPING:
+            self.record_button.setEnabled(False)
+        else:
+            self.record_button.setEnabled(True)
+            self.record_button.setText("\N{BLACK CIRCLE} REC")
+            self.record_button.setStyleSheet("")
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self._pending_state is not None:
+            new_state, old_state = self._pending_state
+            self._pending_state = None
+            self.handle_state_change(new_state, old_state)
+
+
+class PreviewArea(QLabel):
+    """Letterboxed live preview rendered from lores frames."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self._pending_state = None
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setMinimumSize(640, 360)
+        self.setText("No signal")
+        self.setStyleSheet("background-color: black; color: #666;")
+
+    def display_frame(self, frame) -> None:
+        """Render an XRGB8888 numpy frame straight from the ISP."""
+        if frame is None:
+            return
+        h, w = frame.shape[:2]
+        image = QImage(np.ascontiguousarray(frame).data, w, h, 4 * w,
+                       QImage.Format.Format_RGB32)
+        self.setPixmap(QPixmap.fromImage(image.copy()))
+
+    def handle_state_change(self, new_state, old_state) -> None:
+        """Clear the frame when leaving preview/recording."""
+        if not self.isVisible():
+            self._pending_state = (new_state, old_state)
+            return
+        if new_state in (CameraState.IDLE, CameraState.ERROR):
+            self.clear()
+            self.setText("No signal" if new_state == CameraState.IDLE else "Camera error")
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self._pending_state is not None:
+            new_state, old_state = self._pending_state
+            self._pending_state = None
+            self.handle_state_change(new_state, old_state)
@@ -0,0 +1,6 @@
+"""Utility package for CineLuck."""
+
+from .file_utils import FileUtils
+from .system_info import SystemInfo
+
+__all__ = ["FileUtils", "SystemInfo"]
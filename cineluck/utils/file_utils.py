@@ -0,0 +1,61 @@
+"""File management helpers: recording paths, sidecars and free-space checks."""
+
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class FileUtils:
+    """Builds recording paths and monitors storage per the project layout:
+
+    Movies/CineLuck/YYYY-MM-DD/YYYY-MM-DD_HH-MM-SS_2Kfps_codec.mkv
+    """
+
+    def __init__(self, config_manager=None):
+        self.logger = logging.getLogger(__name__)
+        self.config_manager = config_manager
+        self.take_counter = 0
+
+    def get_recording_root(self) -> Path:
+        """Return the configured recording root, expanded."""
+        root = "~/Movies/CineLuck"
+        if self.config_manager is not None:
+            root = self.config_manager.get("recording_dir", root)
+        return Path(root).expanduser()
+
+    def get_recording_dir(self) -> Path:
+        """Return (and create) today's recording directory."""
+        day_dir = self.get_recording_root() / time.strftime("%Y-%m-%d")
+        day_dir.mkdir(parents=True, exist_ok=True)
+        return day_dir
+
+    def build_output_path(self, fps: int, codec: str, container: str) -> Path:
+        """Build the next clip path, bumping the rolling take counter."""
+        self.take_counter += 1
+        stamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+        name = f"{stamp}_2K{fps}_{codec}.{container}"
+        return self.get_recording_dir() / name
+
+    def write_sidecar(self, clip_path: Path, settings: Dict[str, Any]) -> bool:
+        """Write the camera-settings sidecar JSON next to the clip."""
+        sidecar = clip_path.with_suffix(".json")
+        try:
+            with open(sidecar, "w", encoding="utf-8") as f:
+                json.dump(settings, f, indent=2)
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to write sidecar: {e}")
+            return False
+
+    def get_free_space_gb(self, path: Optional[Path] = None) -> float:
+        """Return free space in GiB on the volume holding *path*."""
+        target = path if path is not None else self.get_recording_root()
+        try:
+            usage = shutil.disk_usage(target)
+            return usage.free / (1024 ** 3)
+        except OSError as e:
+            self.logger.error(f"Failed to stat free space: {e}")
+            return 0.0
@@ -0,0 +1,52 @@
+"""System status helpers for the Raspberry Pi 5: temperature, load, throttling."""
+
+import logging
+import os
+from pathlib import Path
+
+
+_THERMAL_ZONE = Path("/sys/class/thermal/thermal_zone0/temp")
+
+
+class SystemInfo:
+    """Reads CPU temperature and load from sysfs/procfs."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def get_cpu_temperature(self) -> float:
+        """Return the SoC temperature in degrees Celsius (0.0 on failure)."""
+        try:
+            with open(_THERMAL_ZONE, "r") as f:
+                return int(f.read().strip()) / 1000.0
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Temperature read failed: {e}")
+            return 0.0
+
+    def get_load_average(self) -> float:
+        """Return the 1-minute load average."""
+        try:
+            return os.getloadavg()[0]
+        except OSError:
+            return 0.0
+
+    def get_snapshot(self, storage_path=None) -> dict:
+        """Read all monitored predictors in one bundled pass.
+
+        Returns {"cpu_temp", "load_1min", "free_space_gb"}; free space is
+        only sampled when *storage_path* is given. Callers that need
+        several readings per tick should take one snapshot instead of
+        issuing separate sysfs/statvfs calls.
+        """
+        snapshot = {
+            "cpu_temp": self.get_cpu_temperature(),
+            "load_1min": self.get_load_average(),
+            "free_space_gb": 0.0,
+        }
+        if storage_path is not None:
+            try:
+                stats = os.statvfs(storage_path)
+                snapshot["free_space_gb"] = stats.f_bavail * stats.f_frsize / (1024 ** 3)
+            except OSError as e:
+                self.logger.debug(f"statvfs failed: {e}")
+        return snapshot
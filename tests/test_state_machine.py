@@ -0,0 +1,109 @@
+"""Headless regression tests for the state machine.
+
+Runs against the callback fallback (CINELUCK_NO_QT) so no Qt event loop
+is needed — the non-Qt build exists expressly so this flow can be
+exercised off-target. Callbacks registered on the fallback base are held
+weakly, so each test keeps strong references to its observers.
+"""
+
+import os
+import time
+
+os.environ.setdefault("CINELUCK_NO_QT", "1")  # must precede the import
+
+from cineluck.state.machine import CameraState, StateMachine  # noqa: E402
+
+
+def _wait_for(predicate, timeout=3.0, interval=0.01):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return predicate()
+
+
+def test_invalid_transition_rejected():
+    sm = StateMachine()
+    changes = []
+
+    def on_change(new, old):
+        changes.append((new, old))
+
+    sm.connect_state_changed(on_change)
+    assert not sm.transition_to(CameraState.RECORDING)
+    assert sm.current_state is CameraState.IDLE
+    assert changes == []
+    sm.shutdown()
+
+
+def test_valid_transition_emits_new_then_old():
+    sm = StateMachine()
+    changes = []
+
+    def on_change(new, old):
+        changes.append((new, old))
+
+    sm.connect_state_changed(on_change)
+    assert sm.transition_to(CameraState.PREVIEW)
+    assert changes == [(CameraState.PREVIEW, CameraState.IDLE)]
+    sm.shutdown()
+
+
+def test_error_emits_once_with_prior_state():
+    sm = StateMachine()
+    changes = []
+    errors = []
+
+    def on_change(new, old):
+        changes.append((new, old))
+
+    def on_error(message):
+        errors.append(message)
+
+    sm.connect_state_changed(on_change)
+    sm.connect_error_occurred(on_error)
+    sm.transition_to(CameraState.PREVIEW)
+    changes.clear()
+
+    sm._handle_error("boom")
+
+    assert sm.current_state is CameraState.ERROR
+    assert errors == ["boom"]
+    # Exactly one emission, reporting the state actually left — the old
+    # post-mutation read announced ERROR -> ERROR.
+    assert changes == [(CameraState.ERROR, CameraState.PREVIEW)]
+    sm.shutdown()
+
+
+def test_watchdog_timeout_recovers_to_preview():
+    sm = StateMachine(watchdog_timeout=0.05)
+    errors = []
+
+    def on_error(message):
+        errors.append(message)
+
+    sm.connect_error_occurred(on_error)
+    sm.transition_to(CameraState.PREVIEW)
+
+    # No reset_watchdog calls: the stalled preview must trip the watchdog.
+    assert _wait_for(lambda: sm.current_state is CameraState.ERROR)
+    assert errors and "watchdog" in errors[0]
+
+    # Widen the timeout so the recovered PREVIEW holds while we observe it.
+    sm._watchdog_timeout = 60.0
+    # The scheduled recovery (2 s) walks ERROR -> IDLE -> PREVIEW.
+    assert _wait_for(lambda: sm.current_state is CameraState.PREVIEW, timeout=4.0)
+    sm.shutdown()
+
+
+def test_reset_watchdog_defers_timeout():
+    sm = StateMachine(watchdog_timeout=0.2)
+    sm.transition_to(CameraState.PREVIEW)
+    # Keep signalling liveness for well past the timeout window.
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        sm.reset_watchdog()
+        time.sleep(0.05)
+    assert sm.current_state is CameraState.PREVIEW
+    sm.shutdown()